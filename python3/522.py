@@ -6,6 +6,8 @@ the pattern in the string. For example, given "abracadabra" and the pattern
 
 from typing import List
 
+from kmp import kmp_findall
+
 
 def indices(s: str, pattern: str) -> List[int]:
     """I think that the given example makes this problem look deceptively easy.
@@ -16,26 +18,11 @@ def indices(s: str, pattern: str) -> List[int]:
 
     The idea behind KMP is that you don't need to re-check every character in a
     pattern if there's a mismatch in the string.
-    """
-    prefix_indices = []
-    T = build_lps_table(pattern)
-    k = 0
-
-    for j in range(len(s)):
-        if s[j] == pattern[k]:
-            j += 1
-            k += 1
-
-            if k == len(pattern):
-                prefix_indices.append(j - k)
-                k = T[k - 1]
-        else:
-            k = T[k]
 
-            if k < 0:
-                j += 1
-                k += 1
-    return prefix_indices
+    The search itself is the shared engine in `kmp.py`, which reports every
+    (possibly overlapping) match in a single O(n + m) pass.
+    """
+    return kmp_findall(pattern, s)
 
 
 def build_lps_table(prefix: str) -> List[int]:
@@ -92,3 +79,10 @@ def test_search():
     expected = [0, 7]
     result = indices(s, pattern)
     assert expected == result
+
+
+def test_search_overlapping():
+    assert indices("aaaaa", "aa") == [0, 1, 2, 3]
+    assert indices("abaabab", "abab") == [3]
+    assert indices("abaabaab", "abaab") == [0, 3]
+    assert indices("", "abc") == []
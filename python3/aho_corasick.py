@@ -0,0 +1,210 @@
+"""
+The Aho-Corasick multi-pattern string matching algorithm.
+
+This is the KMP idea from `kmp.py` generalized to a set of needles. Instead of an LPS table for a
+single needle, we build a trie of every needle and give each trie node a failure link: the node for
+the longest proper suffix of the node's string that is also a prefix of some needle. When the next
+haystack character doesn't extend the current match we follow failure links, exactly like we jump
+back through the LPS table in KMP.
+
+Building the automaton is $O(M)$ where $M$ is the total length of the needles. Scanning is
+$O(n + z)$ where $n$ is the length of the haystack and $z$ is the number of matches, regardless of
+how many needles there are, so one pass replaces a KMP pass per needle.
+"""
+
+from collections import deque
+from collections.abc import Generator, Iterable
+
+from kmp import DEFAULT_CHUNK_SIZE, Readable, Text, iter_chunks
+
+type Match = tuple[str | bytes, int]
+"""A `(needle, start offset)` pair."""
+
+
+class AhoCorasick:
+    """
+    A compiled Aho-Corasick automaton for a fixed set of needles.
+
+    The automaton is immutable once it's built, so it can be reused for any number of haystacks.
+    Use `finditer` to scan a haystack that's in memory, or `matcher` to scan one in chunks.
+    """
+
+    def __init__(self, needles: Iterable[Text]) -> None:
+        """
+        Args:
+            needles: The substrings to search for. None of them may be empty, and they must either
+              all be `str` or all be bytes-like. Duplicates are ignored.
+        """
+        patterns: list[str | bytes] = []
+        seen: set[str | bytes] = set()
+        for needle in needles:
+            pattern = needle if isinstance(needle, str) else bytes(needle)
+            if len(pattern) == 0:
+                raise ValueError("The needles must not be empty")
+            if pattern not in seen:
+                seen.add(pattern)
+                patterns.append(pattern)
+        if len({isinstance(p, str) for p in patterns}) > 1:
+            raise TypeError("The needles must all be str or all be bytes-like")
+
+        self.patterns: list[str | bytes] = patterns
+        """The unique needles, in the order they were first given."""
+
+        self._is_text = len(patterns) == 0 or isinstance(patterns[0], str)
+
+        # The trie. State 0 is the root, `_goto[s]` maps the next character to the child state.
+        self._goto: list[dict[str | int, int]] = [{}]
+
+        # The indices into `patterns` of the needles that end exactly at each state.
+        self._out: list[list[int]] = [[]]
+
+        for idx, pattern in enumerate(patterns):
+            state = 0
+            for c in pattern:
+                nxt = self._goto[state].get(c)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][c] = nxt
+                    self._goto.append({})
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(idx)
+
+        # `_fail[s]` is the state for the longest proper suffix of `s` that's also in the trie.
+        self._fail: list[int] = [0] * len(self._goto)
+
+        # `_dict_link[s]` is the closest state along the failure chain of `s` that has an output,
+        # so we only visit states that report something while collecting matches. Following this
+        # instead of copying every output list down the failure chain keeps memory linear.
+        self._dict_link: list[int] = [0] * len(self._goto)
+
+        # Breadth first, so a state's failure link is always computed before its children's.
+        q: deque[int] = deque(self._goto[0].values())
+        while q:
+            state = q.popleft()
+            for c, child in self._goto[state].items():
+                q.append(child)
+                fallback = self._fail[state]
+                while fallback and c not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                # The root is the only state whose child can be its own failure link.
+                target = self._goto[fallback].get(c, 0)
+                self._fail[child] = target if target != child else 0
+                link = self._fail[child]
+                self._dict_link[child] = (
+                    link if self._out[link] else self._dict_link[link]
+                )
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def matcher(self) -> "AhoCorasickMatcher":
+        """Create a resumable matcher that shares this automaton."""
+        return AhoCorasickMatcher(self)
+
+    def finditer(self, haystack: Text) -> Generator[Match, None, None]:
+        """
+        Find every occurrence of every needle in `haystack` in a single pass.
+
+        Returns:
+            A generator of `(needle, start offset)` pairs, ordered by where each match ends. Matches
+            that end at the same position are ordered from the longest needle to the shortest.
+        """
+        return self.matcher().scan(haystack)
+
+    def findall(self, haystack: Text) -> list[Match]:
+        """Eager version of `finditer`."""
+        return list(self.finditer(haystack))
+
+
+class AhoCorasickMatcher:
+    """
+    The search state for one haystack, which can be fed to the automaton in chunks.
+
+    Like `kmp.StreamMatcher`, the only state is the current automaton state and the number of
+    elements consumed so far, so memory doesn't depend on the size of the haystack and matches that
+    straddle chunk boundaries are still found.
+    """
+
+    def __init__(self, automaton: AhoCorasick) -> None:
+        self.automaton = automaton
+        """The compiled automaton this matcher runs."""
+
+        self._state = 0
+        self._offset = 0
+
+    @property
+    def offset(self) -> int:
+        """The number of haystack elements consumed so far."""
+        return self._offset
+
+    def reset(self) -> None:
+        """Forget everything we've seen so the matcher can be reused for a new haystack."""
+        self._state = 0
+        self._offset = 0
+
+    def scan(self, chunk: Text) -> Generator[Match, None, None]:
+        """
+        Lazily scan the next chunk of the haystack.
+
+        The state is saved before each match is yielded, so if the caller stops early the matcher
+        has consumed everything up to and including the end of the last yielded match.
+
+        Returns:
+            A generator of `(needle, start offset)` pairs for every match that ends in `chunk`.
+        """
+        automaton = self.automaton
+        if len(automaton.patterns) > 0 and isinstance(chunk, str) != automaton._is_text:
+            raise TypeError(
+                "The chunk and the needles must both be str or both be bytes-like"
+            )
+        goto = automaton._goto
+        fail = automaton._fail
+        out = automaton._out
+        dict_link = automaton._dict_link
+        patterns = automaton.patterns
+        state = self._state
+        start = self._offset
+
+        for i, c in enumerate(chunk):
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+
+            reporting = state if out[state] else dict_link[state]
+            if reporting:
+                self._state = state
+                self._offset = start + i + 1
+            while reporting:
+                for idx in out[reporting]:
+                    yield patterns[idx], start + i + 1 - len(patterns[idx])
+                reporting = dict_link[reporting]
+
+        self._state = state
+        self._offset = start + len(chunk)
+
+    def feed(self, chunk: Text) -> list[Match]:
+        """Eager version of `scan`."""
+        return list(self.scan(chunk))
+
+
+def aho_corasick_stream(
+    automaton: AhoCorasick,
+    source: Readable | Iterable[Text],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Generator[Match, None, None]:
+    """
+    Find every occurrence of every needle in a haystack that's too big to hold in memory.
+
+    Args:
+        automaton: The compiled needles.
+        source: Either a file-like object with a `read` method or any iterable of chunks.
+        chunk_size: How much to read at a time if `source` is file-like.
+
+    Returns:
+        A generator of `(needle, absolute start offset)` pairs.
+    """
+    matcher = automaton.matcher()
+    chunks = iter_chunks(source, chunk_size) if isinstance(source, Readable) else source
+    for chunk in chunks:
+        yield from matcher.scan(chunk)
@@ -0,0 +1,88 @@
+"""
+Benchmarks ingesting hits into `solution_1756.HitCounter`.
+
+Hits are seconds within a day of traffic. By default they arrive slightly out of order, as if
+collectors report up to a minute late. With `--order random` they arrive in a random order, which
+is the worst case for a sorted list. Run it directly:
+
+```
+python bench_1756.py --hits 10000000
+python bench_1756.py --hits 1000000 --order random --compare-list
+```
+
+`--compare-list` also times the sorted list with `bisect.insort` that `HitCounter` used to be built
+on, which is $O(n)$ per insertion. Keep the hit count small for that, since it's quadratic overall.
+"""
+
+import argparse
+import bisect
+import random
+import time
+from array import array
+
+from solution_1756 import HitCounter
+
+DAY: int = 24 * 60 * 60
+"""The number of seconds of traffic we generate hits for."""
+
+START: int = 1_700_000_000
+"""The unix timestamp the traffic starts at."""
+
+
+def generate_hits(n: int, shuffle: bool, seed: int = 1756) -> array[int]:
+    """`n` roughly increasing timestamps, each up to a minute late, or in random order."""
+    rng = random.Random(seed)
+    hits = [START + (i * DAY) // n - rng.randrange(60) for i in range(n)]
+    if shuffle:
+        rng.shuffle(hits)
+    return array("q", hits)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hits", type=int, default=10_000_000)
+    parser.add_argument("--order", choices=["late", "random"], default="late")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--compare-list", action="store_true")
+    args = parser.parse_args()
+
+    hits = generate_hits(args.hits, shuffle=args.order == "random")
+
+    hc = HitCounter()
+    start = time.perf_counter()
+    for ts in hits:
+        hc.record(ts)
+    seconds = time.perf_counter() - start
+    print(
+        f"HitCounter: {args.hits} hits in {seconds:.2f}s ({args.hits / seconds:,.0f} hits/s)"
+    )
+
+    batch_size = args.batch_size
+    hc_batched = HitCounter()
+    start = time.perf_counter()
+    for i in range(0, len(hits), batch_size):
+        hc_batched.record_many(hits[i : i + batch_size])
+    seconds = time.perf_counter() - start
+    print(
+        f"HitCounter.record_many (batches of {batch_size}): {args.hits} hits in {seconds:.2f}s "
+        f"({args.hits / seconds:,.0f} hits/s)"
+    )
+    assert hc_batched.total == hc.total
+
+    start = time.perf_counter()
+    in_range = hc.range(START + DAY // 4, START + DAY // 2)
+    print(f"HitCounter.range: {in_range} hits in {time.perf_counter() - start:.6f}s")
+
+    if args.compare_list:
+        recorded: list[int] = []
+        start = time.perf_counter()
+        for ts in hits:
+            bisect.insort(recorded, ts)
+        seconds = time.perf_counter() - start
+        print(
+            f"Sorted list: {args.hits} hits in {seconds:.2f}s ({args.hits / seconds:,.0f} hits/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmarks the zero-copy bytes search path in `kmp.py` against the `str` path.
+
+Run it directly:
+
+```
+python bench_kmp.py --size 4000000
+```
+"""
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+from functools import partial
+
+from kmp import StreamMatcher, kmp_findall
+
+
+def _time(fn: Callable[[], list[int]], repeat: int) -> tuple[float, list[int]]:
+    """Returns the best wall clock time out of `repeat` runs, and the result of the last run."""
+    best = float("inf")
+    result: list[int] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _generic(needle: bytes, haystack: bytes) -> list[int]:
+    """The LPS-based engine that every type of haystack used to go through."""
+    return StreamMatcher(needle).feed(haystack)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=1_000_000, help="Haystack size")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = ["the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog"]
+    cases = {
+        "worst case": ("a" * 31 + "b", "a" * args.size),
+        "english": (
+            "lazy cat",
+            " ".join(rng.choice(words) for _ in range(args.size // 4))[: args.size],
+        ),
+        "dna": ("GATTACAGATTACA", "".join(rng.choices("ACGT", k=args.size))),
+    }
+
+    print(f"{'case':<12} {'path':<22} {'seconds':>9} {'MB/s':>9}")
+    for name, (needle, haystack) in cases.items():
+        raw = haystack.encode()
+        bneedle = needle.encode()
+        paths: dict[str, Callable[[], list[int]]] = {
+            "str": partial(kmp_findall, needle, haystack),
+            "bytes (generic)": partial(_generic, bneedle, raw),
+            "bytes (zero-copy)": partial(kmp_findall, bneedle, raw),
+            "memoryview (zero-copy)": partial(kmp_findall, bneedle, memoryview(raw)),
+        }
+        expected = None
+        for path, fn in paths.items():
+            seconds, result = _time(fn, args.repeat)
+            if expected is None:
+                expected = result
+            assert result == expected, f"{path} disagrees with the str path"
+            print(
+                f"{name:<12} {path:<22} {seconds:>9.3f} {len(raw) / seconds / 1e6:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+A reproducible benchmark suite for the substring search code in `kmp.py`, `522.py` and the other
+search backends.
+
+Every target is run over a grid of needle lengths and haystack sizes for a few kinds of data:
+
+* `worst_case`: `"a" * n` searched for `"a" * (m - 1) + "b"`, which makes naive search quadratic
+  and forces KMP to fall back on every character.
+* `text`: English-like words, searched for a phrase that only shows up at the very end.
+* `dna`: A uniformly random four letter alphabet, where skips are short.
+
+For each grid point we report the throughput in MB/s (best of several runs) and the peak memory
+allocated by the search (measured in a separate run with `tracemalloc`, since tracing slows things
+down). Results are written as JSON and can be compared against a stored baseline:
+
+```
+python bench_substr.py --output results.json
+python bench_substr.py --save-baseline        # Record a new baseline for this machine
+```
+
+The default baseline is `bench_substr_baseline.json`. Throughput depends on the machine, so record
+a fresh baseline before comparing on new hardware. The script exits with a non-zero status if any
+grid point is slower than the baseline by more than the tolerance.
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import random
+import sys
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Final
+
+from horspool import horspool_substr
+from kmp import kmp_findall, kmp_substr, lps_table
+from two_way import two_way_substr
+
+# The module name starts with a digit, so it can't be imported with an import statement.
+problem_522 = importlib.import_module("522")
+
+DEFAULT_BASELINE: Final[Path] = Path(__file__).with_name("bench_substr_baseline.json")
+"""Where the baseline results are stored."""
+
+SEED: Final[int] = 1754
+"""Seed for all of the generated data, so every run searches exactly the same inputs."""
+
+MIN_RUN_SECONDS: Final[float] = 0.05
+"""How long one timed run should take at least. A single call can take just a few microseconds
+(e.g. `lps_table` on a short needle), so each run loops over as many calls as it takes to reach
+this, which keeps the timer's resolution and scheduling jitter from dominating the result."""
+
+WORDS: Final[list[str]] = (
+    "the of and to in is was that for it with as his on be at by had are but from or have an they "
+    "which one you were all her she there would their we him been has when who will no more if out "
+    "so up said what its about than into them can only other time new some could these two may "
+    "first then do any like my now over such our man me even most made after also did many off "
+    "before must well back through years where much your way down should because long each just"
+).split()
+"""Common English words. Earlier words are picked more often, roughly following Zipf's law."""
+
+
+@dataclass(frozen=True)
+class Target:
+    """Something to benchmark."""
+
+    name: str
+    """A unique name for the target, used to match up results with the baseline."""
+
+    fn: Callable[[str, str], object]
+    """Called with `(needle, haystack)`."""
+
+    needle_only: bool = False
+    """Whether this only preprocesses the needle, so the haystack size doesn't matter."""
+
+
+TARGETS: Final[list[Target]] = [
+    Target("kmp.kmp_substr", kmp_substr),
+    Target("kmp.kmp_findall", kmp_findall),
+    Target(
+        "522.indices", lambda needle, haystack: problem_522.indices(haystack, needle)
+    ),
+    Target("horspool.horspool_substr", horspool_substr),
+    Target("two_way.two_way_substr", two_way_substr),
+    Target("kmp.lps_table", lambda needle, _: lps_table(needle), needle_only=True),
+    Target(
+        "522.build_lps_table",
+        lambda needle, _: problem_522.build_lps_table(needle),
+        needle_only=True,
+    ),
+]
+"""Everything we benchmark."""
+
+
+def worst_case(needle_len: int, size: int, _: random.Random) -> tuple[str, str]:
+    """A needle that almost matches at every position of the haystack."""
+    return "a" * (needle_len - 1) + "b", "a" * size
+
+
+def text(needle_len: int, size: int, rng: random.Random) -> tuple[str, str]:
+    """English-like text, with a needle taken from the end of it."""
+    weights = [1 / (rank + 1) for rank in range(len(WORDS))]
+    words: list[str] = []
+    # The length of `" ".join(words)`, which has one separator fewer than it has words.
+    length = -1
+    while length < size:
+        words.append(rng.choices(WORDS, weights)[0])
+        length += len(words[-1]) + 1
+    haystack = " ".join(words)[:size]
+    # A phrase from the end of the haystack, so we have to scan (almost) all of it.
+    return haystack[size - needle_len :], haystack
+
+
+def dna(needle_len: int, size: int, rng: random.Random) -> tuple[str, str]:
+    """A random needle and haystack over the alphabet "ACGT"."""
+    needle = "".join(rng.choices("ACGT", k=needle_len))
+    return needle, "".join(rng.choices("ACGT", k=size))
+
+
+DATASETS: Final[dict[str, Callable[[int, int, random.Random], tuple[str, str]]]] = {
+    "worst_case": worst_case,
+    "text": text,
+    "dna": dna,
+}
+"""Generators of `(needle, haystack)` pairs by name."""
+
+
+@dataclass(frozen=True)
+class Result:
+    """The measurements for one target at one grid point."""
+
+    target: str
+    dataset: str
+    needle_len: int
+    haystack_size: int
+    seconds: float
+    """The wall clock time of a single call, from the best of every repetition."""
+
+    mb_per_s: float
+    """How many megabytes of input (the haystack, or the needle for `needle_only` targets) were
+    processed per second."""
+
+    peak_bytes: int
+    """The peak memory allocated while running the target once."""
+
+    @property
+    def key(self) -> tuple[str, str, int, int]:
+        return (self.target, self.dataset, self.needle_len, self.haystack_size)
+
+
+def calibrate(timer: timeit.Timer) -> int:
+    """How many calls it takes for one timed run to last at least `MIN_RUN_SECONDS`."""
+    number = 1
+    while (elapsed := timer.timeit(number)) < MIN_RUN_SECONDS:
+        number = max(number * 2, int(number * MIN_RUN_SECONDS / max(elapsed, 1e-9)) + 1)
+    return number
+
+
+def measure(
+    target: Target, dataset: str, needle: str, haystack: str, seconds: float
+) -> Result:
+    """Collect the result for a single grid point, given the best time of one call."""
+    tracemalloc.start()
+    try:
+        target.fn(needle, haystack)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    processed = len(needle) if target.needle_only else len(haystack)
+    return Result(
+        target=target.name,
+        dataset=dataset,
+        needle_len=len(needle),
+        haystack_size=0 if target.needle_only else len(haystack),
+        seconds=seconds,
+        mb_per_s=processed / seconds / 1e6 if seconds > 0 else float("inf"),
+        peak_bytes=peak,
+    )
+
+
+def run(
+    needle_lens: list[int],
+    sizes: list[int],
+    repeat: int,
+    targets: list[Target] = TARGETS,
+) -> list[Result]:
+    """
+    Benchmark every target over the whole grid.
+
+    Each of the `repeat` rounds times every grid point once, and we keep the best round for each
+    point. Spreading a point's runs over the whole benchmark, rather than running them back to back,
+    keeps a few seconds of a busy machine from slowing down every run of the same points.
+    """
+    points: list[tuple[Target, str, str, str]] = []
+    for dataset, generate in DATASETS.items():
+        for needle_len in needle_lens:
+            for target in targets:
+                # Preprocessing targets don't depend on the haystack, so one size is enough.
+                for size in sizes[:1] if target.needle_only else sizes:
+                    if needle_len > size:
+                        continue
+                    # A fresh generator per grid point keeps the data independent of the grid.
+                    rng = random.Random(f"{SEED}-{dataset}-{needle_len}-{size}")
+                    needle, haystack = generate(needle_len, size, rng)
+                    points.append((target, dataset, needle, haystack))
+
+    timers = [
+        timeit.Timer(partial(target.fn, needle, haystack))
+        for target, _, needle, haystack in points
+    ]
+    numbers = [calibrate(timer) for timer in timers]
+    best = [float("inf")] * len(points)
+    for _ in range(repeat):
+        for i, (timer, number) in enumerate(zip(timers, numbers, strict=True)):
+            best[i] = min(best[i], timer.timeit(number) / number)
+    return [
+        measure(*point, seconds) for point, seconds in zip(points, best, strict=True)
+    ]
+
+
+def compare(
+    results: list[Result], baseline: list[Result], tolerance: float
+) -> list[tuple[Result, Result]]:
+    """
+    Returns:
+        `(result, baseline)` pairs for every grid point whose throughput dropped by more than
+        `tolerance` (a fraction) compared to the baseline.
+    """
+    by_key = {b.key: b for b in baseline}
+    regressions: list[tuple[Result, Result]] = []
+    for result in results:
+        base = by_key.get(result.key)
+        if base is not None and result.mb_per_s < base.mb_per_s * (1 - tolerance):
+            regressions.append((result, base))
+    return regressions
+
+
+def to_json(results: list[Result]) -> dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": [asdict(r) for r in results],
+    }
+
+
+def from_json(data: dict[str, Any]) -> list[Result]:
+    return [Result(**r) for r in data["results"]]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--needle-lens", type=int, nargs="+", default=[4, 32, 256])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--output", type=Path, help="Write the results to this JSON file"
+    )
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="The fraction of throughput that can be lost before it counts as a regression",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Overwrite the baseline with these results instead of comparing against it",
+    )
+    args = parser.parse_args()
+
+    results = run(args.needle_lens, args.sizes, args.repeat)
+
+    print(
+        f"{'target':<26} {'dataset':<11} {'m':>5} {'n':>9} {'MB/s':>9} {'peak KiB':>9}"
+    )
+    for r in results:
+        print(
+            f"{r.target:<26} {r.dataset:<11} {r.needle_len:>5} {r.haystack_size:>9} "
+            f"{r.mb_per_s:>9.2f} {r.peak_bytes / 1024:>9.1f}"
+        )
+
+    data = to_json(results)
+    if args.output is not None:
+        args.output.write_text(json.dumps(data, indent=2) + "\n")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(data, indent=2) + "\n")
+        print(f"Saved the baseline to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}, skipping the comparison")
+        return 0
+
+    regressions = compare(
+        results, from_json(json.loads(args.baseline.read_text())), args.tolerance
+    )
+    for result, base in regressions:
+        print(
+            f"REGRESSION {result.target} {result.dataset} m={result.needle_len} "
+            f"n={result.haystack_size}: {result.mb_per_s:.2f} MB/s, "
+            f"baseline {base.mb_per_s:.2f} MB/s"
+        )
+    if not regressions:
+        print("No regressions against the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+The Boyer-Moore-Horspool substring matching algorithm.
+
+We line the needle up with the haystack and compare from the end of the needle. After a mismatch
+(or a match) we shift the needle so that the haystack character under the needle's last position
+lines up with its rightmost occurrence in the rest of the needle. If that character isn't in the
+needle at all we can skip the whole length of the needle, which is why this is sublinear on average
+for long needles over large alphabets. The worst case is $O(nm)$, though, e.g. "ba..a" in "aa..a".
+"""
+
+from kmp import Text
+
+
+def bad_character_table(needle: Text) -> dict[str | int, int]:
+    """
+    Construct the shift table for Horspool's algorithm.
+
+    Args:
+        needle: The string that you want to search for matches within a larger string.
+
+    Returns:
+        A mapping from each character in `needle[:-1]` to how far the needle can be shifted when
+        that character is aligned with the needle's last position. Characters that aren't in the
+        table can be shifted by the full length of the needle.
+    """
+    m = len(needle)
+    # Later occurrences overwrite earlier ones, so we keep the rightmost one.
+    return {c: m - 1 - i for i, c in enumerate(needle[:-1])}
+
+
+def horspool_substr(needle: Text, haystack: Text) -> int:
+    """
+    Uses the Boyer-Moore-Horspool algorithm to find the starting index where `needle` is in
+    `haystack` (if `haystack` contains `needle`).
+
+    Args:
+        needle: The substring to search for within `haystack`. This must not be an empty string.
+        haystack: The string to search. This must not be an empty string.
+
+    Returns:
+        The start index of where `needle` is in `haystack`. If the substring is not found,
+        this will return `-1`.
+    """
+    if len(haystack) == 0:
+        raise ValueError("The haystack must not be an empty string")
+    if len(needle) == 0:
+        raise ValueError("The needle must not be an empty string")
+    if isinstance(needle, str) != isinstance(haystack, str):
+        raise TypeError(
+            "The needle and haystack must both be str or both be bytes-like"
+        )
+
+    m = len(needle)
+    n = len(haystack)
+    shift = bad_character_table(needle)
+    last = needle[m - 1]
+    i = 0
+
+    while i <= n - m:
+        c = haystack[i + m - 1]
+        # Checking the last character first rules out most windows without comparing the rest.
+        # The comparison of the rest of the window happens in C.
+        if c == last and haystack[i : i + m - 1] == needle[: m - 1]:
+            return i
+        i += shift.get(c, m)
+    return -1
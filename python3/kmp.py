@@ -2,8 +2,39 @@
 The KMP substring matching algorithm. Trying to derive this from scratch.
 """
 
+import functools
+import re
+from collections.abc import Buffer, Generator, Iterable, Iterator
+from itertools import islice
+from typing import Final, Protocol, runtime_checkable
 
-def lps_table(needle: str) -> list[int]:
+DEFAULT_CHUNK_SIZE: Final[int] = 1 << 16
+"""The number of elements to read at a time when scanning a file-like object."""
+
+MAX_CACHE_SIZE: Final[int] = 4096
+"""How many compiled LPS tables to keep around before evicting the least recently used one."""
+
+MAX_DFA_NEEDLE_SIZE: Final[int] = 1024
+"""The longest bytes needle we build a full 256-way transition table for. The table takes
+$O(256 m)$ memory, so longer needles use the regular LPS-based search instead."""
+
+MAX_DFA_CACHE_SIZE: Final[int] = 32
+"""How many byte automata to keep around. Each one is up to about 2 MB (for a needle of
+`MAX_DFA_NEEDLE_SIZE` bytes), so this is much smaller than `MAX_CACHE_SIZE`."""
+
+type Text = str | Buffer
+"""The types we can scan. Indexing a bytes-like object (`bytes`, `bytearray`, `memoryview`, `mmap`,
+...) yields `int`s, which is fine as long as the needle is bytes-like too."""
+
+
+@runtime_checkable
+class Readable(Protocol):
+    """Anything with a `read(size)` method, e.g. an open file or `socket.makefile()`."""
+
+    def read(self, size: int, /) -> Text: ...
+
+
+def lps_table(needle: str | bytes) -> list[int]:
     """
     Construct the lookup table for the longest prefix that is also a suffix (LPS) for every substring
     of `needle`.
@@ -42,14 +73,14 @@ def lps_table(needle: str) -> list[int]:
         # build up one of the shorter LPS' we discovered. This way, we don't have to scan
         # from the very beginning of the string all over again and redo work.
         elif lp_i > 0:
-            lp_i = lps[lp_i - 1]
+            lp_i = lps[lp_i - 1] if lp_i > 1 else 0
         else:
             lp_i = 0
             i += 1
     return lps
 
 
-def kmp_substr(needle: str, haystack: str) -> int:
+def kmp_substr(needle: Text, haystack: Text) -> int:
     """
     Uses the KMP string matching algorithm to find the starting index where `needle`
     is in haystack (if `haystack` contains `needle`).
@@ -69,44 +100,350 @@ def kmp_substr(needle: str, haystack: str) -> int:
     if len(needle) == 0:
         raise ValueError("The needle must not be an empty string")
 
-    lps = lps_table(needle)
-
-    # Basic sanity checks
-    assert len(lps) == len(needle)
-    assert lps[0] == -1
-
-    # Now we maintain a sliding window with two pointers. Best case scenario is that
-    # we build up matches, so we can move up the index of the haystack and needle simultaneously.
-    # If we have a mismatch, we can slide over the needle based on how many characters have already
-    # matched up. We use the LPS table to avoid redoing work because it can tell us exactly how many
-    # characters still match as we slide the haystack pointer forward.
-
-    h_i = 0  # Pointer in the haystack
-    n_i = 0  # Pointer to the current position in the needle
-
-    while h_i < len(haystack):
-        # import pdb; pdb.set_trace()
-        while (
-            n_i < len(needle) and h_i < len(haystack) and needle[n_i] == haystack[h_i]
-        ):
-            n_i += 1
-            h_i += 1
-
-        # We matched the entire needle. Return the start index in the haystack.
-        if n_i == len(needle):
-            return h_i - len(needle)
-
-        # If we get here, that means we've run into a mismatch. We need to slide the window
-        # up so we don't look at redundant characters in the needle that already match up.
-        while n_i >= 0 and needle[n_i] != haystack[h_i]:
-            n_i = lps[n_i]
-
-        # We have the sentinel value, -1, at the beginning of the string. If `n_i` ends up at -1,
-        # that means we've basically exhausted the search of the needle and none of the characters
-        # between the needle and the haystack match up to the current index `h_i`, so we increment `h_i`.
-        # This is equivalent to moving the sliding window of the needle up all the way, and we try looking
-        # for matches again in the next iteration of the loop.
-        if n_i < 0:
-            h_i += 1
-            n_i = 0
-    return -1
+    # Scan with the same engine as `kmp_finditer` and stop at the first match. A shared engine means
+    # the fallback logic only lives in one place (`StreamMatcher.scan`).
+    return next(kmp_finditer(needle, haystack), -1)
+
+
+@functools.lru_cache(maxsize=MAX_CACHE_SIZE)
+def _fallback_table(needle: str | bytes) -> tuple[int, ...]:
+    """
+    The table the search engine actually uses, cached so that searching for the same needle again
+    skips the $O(m)$ preprocessing.
+
+    `table[k]` is how many characters are still matched after a mismatch (or a full match) when `k`
+    characters were matched. It's the LPS table shifted over by one, with the -1 sentinel clamped
+    to 0.
+    """
+    return (0, *(max(x, 0) for x in lps_table(needle)))
+
+
+@functools.lru_cache(maxsize=MAX_DFA_CACHE_SIZE)
+def _byte_dfa(needle: bytes) -> tuple[tuple[int, ...], ...]:
+    """
+    Expand the LPS table of a bytes needle into a full KMP automaton.
+
+    `dfa[k][b]` is the number of matched characters after reading byte `b` when `k` characters were
+    matched. With the whole alphabet spelled out, a mismatch is a single table lookup instead of a
+    walk back through the LPS table, which matters a lot when every step is interpreted Python.
+    """
+    m = len(needle)
+    fallback = _fallback_table(needle)
+    dfa: list[tuple[int, ...]] = []
+    for k in range(m):
+        # Every byte that doesn't extend the match behaves like it would after falling back.
+        row = list(dfa[fallback[k]]) if k > 0 else [0] * 256
+        row[needle[k]] = k + 1
+        dfa.append(tuple(row))
+    # After a full match we keep the longest border of the needle. Non-overlapping searches start
+    # over instead, which `_scan_buffer` handles, so both share one automaton.
+    dfa.append(dfa[fallback[m]])
+    return tuple(dfa)
+
+
+def cache_info() -> functools._CacheInfo:
+    """The hit/miss counters and current size of the LPS table cache."""
+    return _fallback_table.cache_info()
+
+
+def dfa_cache_info() -> functools._CacheInfo:
+    """The hit/miss counters and current size of the byte automaton cache (see `KmpPattern`)."""
+    return _byte_dfa.cache_info()
+
+
+def purge() -> None:
+    """Clear the LPS table and byte automaton caches and reset their counters."""
+    _fallback_table.cache_clear()
+    _byte_dfa.cache_clear()
+
+
+def _scan_buffer(
+    needle: bytes,
+    dfa: tuple[tuple[int, ...], ...],
+    haystack: Buffer,
+    overlapping: bool,
+) -> Generator[int, None, None]:
+    """
+    Run the KMP automaton over a bytes-like haystack in place.
+
+    The haystack is only ever accessed through a `memoryview`, so `bytes`, `bytearray`, `mmap` and
+    friends are searched without being copied or decoded. While nothing is matched we let the `re`
+    engine (which also works on buffers) skip ahead to the next occurrence of the needle's first
+    byte, so we only pay for interpreted Python around candidate matches.
+    """
+    m = len(needle)
+    first_byte = re.compile(re.escape(needle[:1]))
+    # Releasing the views when we're done matters for `mmap`, which can't be closed while a view of
+    # it is alive.
+    with memoryview(haystack) as raw, raw.cast("B") as view:
+        n = len(view)
+        state = 0
+        i = 0
+        while i < n:
+            if state == 0:
+                hit = first_byte.search(view, i)
+                if hit is None:
+                    return
+                i = hit.start()
+            state = dfa[state][view[i]]
+            i += 1
+            if state == m:
+                yield i - m
+                if not overlapping:
+                    state = 0
+
+
+def _scan_long_buffer(
+    matcher: "StreamMatcher", haystack: Buffer
+) -> Generator[int, None, None]:
+    """
+    Run an LPS-based matcher over a bytes-like haystack, for needles too long for `_byte_dfa`.
+
+    Iterating over an `mmap` yields 1-byte `bytes` and over `array("H")` yields 16-bit integers, so
+    like `_scan_buffer` we scan a byte view of the haystack rather than the haystack itself.
+    """
+    with memoryview(haystack) as raw, raw.cast("B") as view:
+        yield from matcher.scan(view)
+
+
+class KmpPattern:
+    """
+    A compiled needle that can be searched for repeatedly, similar to `re.Pattern`.
+
+    Use `compile` to create one.
+    """
+
+    def __init__(self, needle: Text) -> None:
+        if len(needle) == 0:
+            raise ValueError("The needle must not be an empty string")
+        self.needle: str | bytes = needle if isinstance(needle, str) else bytes(needle)
+        """The substring we are searching for."""
+
+        # Looking this up now means the table is in the cache for the lifetime of the pattern's
+        # matchers, even if it gets evicted later.
+        self._fallback = _fallback_table(self.needle)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.needle!r})"
+
+    def matcher(self, overlapping: bool = True) -> "StreamMatcher":
+        """Create a resumable matcher for scanning a haystack in chunks."""
+        return StreamMatcher(self.needle, overlapping, _fallback=self._fallback)
+
+    def finditer(
+        self, haystack: Text, overlapping: bool = True, max_count: int | None = None
+    ) -> Iterator[int]:
+        """
+        Same as `kmp_finditer`, without rebuilding the LPS table.
+
+        Bytes needles searched against a bytes-like haystack (including `memoryview` and `mmap`)
+        take a zero-copy path that runs the full KMP automaton over the raw buffer.
+        """
+        if max_count is not None and max_count < 0:
+            raise ValueError("The max count must not be negative")
+        if isinstance(self.needle, bytes) and not isinstance(haystack, str):
+            if len(self.needle) <= MAX_DFA_NEEDLE_SIZE:
+                dfa = _byte_dfa(self.needle)
+                scan = _scan_buffer(self.needle, dfa, haystack, overlapping)
+            else:
+                scan = _scan_long_buffer(self.matcher(overlapping), haystack)
+        else:
+            scan = self.matcher(overlapping).scan(haystack)
+        return scan if max_count is None else islice(scan, max_count)
+
+    def findall(
+        self, haystack: Text, overlapping: bool = True, max_count: int | None = None
+    ) -> list[int]:
+        """Eager version of `finditer`."""
+        return list(self.finditer(haystack, overlapping, max_count))
+
+    def search(self, haystack: Text) -> int:
+        """
+        Returns:
+            The start index of the first match in `haystack`, or `-1` if there isn't one.
+        """
+        return next(self.finditer(haystack), -1)
+
+
+def compile(needle: Text) -> KmpPattern:
+    """
+    Compile `needle` into a pattern object that can be reused across searches.
+
+    The LPS tables are kept in a bounded LRU cache (see `cache_info`), so compiling the same needle
+    again is cheap as well.
+    """
+    return KmpPattern(needle)
+
+
+class StreamMatcher:
+    """
+    A resumable KMP matcher that consumes the haystack one chunk at a time.
+
+    The only state we keep between chunks is the number of needle characters that are currently
+    matched and the number of haystack elements consumed so far, so a match that straddles a chunk
+    boundary is still found and memory stays $O(m)$ regardless of how big the haystack is.
+    """
+
+    def __init__(
+        self,
+        needle: Text,
+        overlapping: bool = True,
+        _fallback: tuple[int, ...] | None = None,
+    ) -> None:
+        """
+        Args:
+            needle: The substring to search for. This must not be empty. Use a `str` to scan text
+              chunks and a bytes-like object to scan binary chunks.
+            overlapping: Whether matches are allowed to overlap, e.g. whether "aa" matches "aaa"
+              at 0 and 1 or just at 0.
+        """
+        if len(needle) == 0:
+            raise ValueError("The needle must not be an empty string")
+        self.needle: str | bytes = needle if isinstance(needle, str) else bytes(needle)
+        """The substring we are searching for."""
+
+        self.overlapping = overlapping
+        """Whether matches are allowed to overlap."""
+
+        self._fallback = (
+            _fallback_table(self.needle) if _fallback is None else _fallback
+        )
+        self._matched = 0
+        self._offset = 0
+
+    @property
+    def offset(self) -> int:
+        """The number of haystack elements consumed so far."""
+        return self._offset
+
+    def reset(self) -> None:
+        """Forget everything we've seen so the matcher can be reused for a new haystack."""
+        self._matched = 0
+        self._offset = 0
+
+    def scan(self, chunk: Text) -> Generator[int, None, None]:
+        """
+        Lazily scan the next chunk of the haystack.
+
+        The matcher's state is saved before each match is yielded, so if the caller stops early the
+        matcher has consumed everything up to and including the last yielded match.
+
+        Args:
+            chunk: The next piece of the haystack. This must be the same kind of data as the needle
+              (`str` or bytes-like).
+
+        Returns:
+            A generator of the absolute start offsets of every match that ends inside of `chunk`,
+            in ascending order.
+        """
+        if isinstance(chunk, str) != isinstance(self.needle, str):
+            raise TypeError(
+                "The chunk and the needle must both be str or both be bytes-like"
+            )
+        needle = self.needle
+        fallback = self._fallback
+        m = len(needle)
+        # Where we restart after a full match. Restarting from the LPS of the whole needle lets
+        # matches overlap, restarting from scratch doesn't.
+        restart = fallback[m] if self.overlapping else 0
+        matched = self._matched
+        start = self._offset
+
+        for i, c in enumerate(chunk):
+            while matched > 0 and needle[matched] != c:
+                matched = fallback[matched]
+            if needle[matched] == c:
+                matched += 1
+                if matched == m:
+                    matched = restart
+                    self._matched = matched
+                    self._offset = start + i + 1
+                    yield start + i + 1 - m
+
+        self._matched = matched
+        self._offset = start + len(chunk)
+
+    def feed(self, chunk: Text) -> list[int]:
+        """
+        Scan the next chunk of the haystack.
+
+        Args:
+            chunk: The next piece of the haystack. This must be the same kind of data as the needle
+              (`str` or bytes-like).
+
+        Returns:
+            The absolute start offsets of every match that ends inside of `chunk`, in ascending
+            order.
+        """
+        return list(self.scan(chunk))
+
+
+def kmp_finditer(
+    needle: Text,
+    haystack: Text,
+    overlapping: bool = True,
+    max_count: int | None = None,
+) -> Iterator[int]:
+    """
+    Lazily find every occurrence of `needle` in `haystack` in a single $O(n + m)$ pass.
+
+    This is cheaper than calling `kmp_substr` again from the index after each match, which rescans
+    the haystack and rebuilds the LPS table every time.
+
+    Args:
+        needle: The substring to search for within `haystack`. This must not be an empty string.
+        haystack: The string to search. An empty haystack simply has no matches.
+        overlapping: Whether matches are allowed to overlap.
+        max_count: Stop after this many matches. `None` means there is no limit.
+
+    Returns:
+        A generator of the start index of each match, in ascending order.
+    """
+    return compile(needle).finditer(haystack, overlapping, max_count)
+
+
+def kmp_findall(
+    needle: Text,
+    haystack: Text,
+    overlapping: bool = True,
+    max_count: int | None = None,
+) -> list[int]:
+    """
+    Eager version of `kmp_finditer`.
+    """
+    return list(kmp_finditer(needle, haystack, overlapping, max_count))
+
+
+def iter_chunks(
+    stream: Readable, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Generator[Text, None, None]:
+    """
+    Read `stream` in chunks of (at most) `chunk_size` until it's exhausted.
+    """
+    if chunk_size <= 0:
+        raise ValueError("The chunk size must be positive")
+    while chunk := stream.read(chunk_size):
+        yield chunk
+
+
+def kmp_stream(
+    needle: Text,
+    source: Readable | Iterable[Text],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Generator[int, None, None]:
+    """
+    Find every occurrence of `needle` in a haystack that's too big to hold in memory.
+
+    Args:
+        needle: The substring to search for. This must not be empty.
+        source: Either a file-like object with a `read` method (a file, `socket.makefile()`, etc.)
+          or any iterable of chunks, like a generator.
+        chunk_size: How much to read at a time if `source` is file-like.
+
+    Returns:
+        A generator of the absolute start offsets of each match in ascending order.
+    """
+    matcher = StreamMatcher(needle)
+    chunks = iter_chunks(source, chunk_size) if isinstance(source, Readable) else source
+    for chunk in chunks:
+        yield from matcher.feed(chunk)
@@ -0,0 +1,163 @@
+"""
+Substring search over a process pool.
+
+The haystack is split into chunks that overlap by `len(needle) - 1` elements. That way every match
+is completely contained in at least one chunk, and we can search each chunk independently with the
+KMP engine in `kmp.py`. A match is only reported by the chunk it starts in, so there are no
+duplicates, but we still deduplicate while merging to be safe.
+
+When searching a file, each worker memory-maps the file and searches its own window of the map in
+place (see the zero-copy bytes path in `kmp.py`), so the parent process never has to read the file
+or send chunks to the workers.
+"""
+
+import mmap
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Final
+
+from kmp import Text, kmp_findall
+
+DEFAULT_PARALLEL_CHUNK_SIZE: Final[int] = 1 << 24
+"""The default number of elements each worker searches at a time (16 MiB of bytes)."""
+
+
+def chunk_bounds(
+    haystack_size: int, needle_size: int, chunk_size: int
+) -> list[tuple[int, int]]:
+    """
+    Split a haystack into windows for searching.
+
+    Args:
+        haystack_size: The length of the haystack.
+        needle_size: The length of the needle. This must be positive.
+        chunk_size: How many match start positions each window is responsible for. This must be
+          positive.
+
+    Returns:
+        A list of `(start, stop)` windows. Each window owns the match start positions in
+        `[start, start + chunk_size)` and extends `needle_size - 1` elements past that, so that
+        matches that straddle two chunks are found by the chunk they start in.
+    """
+    if needle_size <= 0:
+        raise ValueError("The needle must not be empty")
+    if chunk_size <= 0:
+        raise ValueError("The chunk size must be positive")
+    return [
+        (start, min(start + chunk_size + needle_size - 1, haystack_size))
+        for start in range(0, haystack_size, chunk_size)
+    ]
+
+
+def _search_window(needle: Text, window: Text, start: int) -> list[int]:
+    """Search one in-memory window, translating match offsets back to global ones."""
+    return [start + i for i in kmp_findall(needle, window)]
+
+
+def _search_file_window(
+    needle: bytes, path: str | os.PathLike[str], start: int, stop: int
+) -> list[int]:
+    """Search `[start, stop)` of a file in place through a memory map."""
+    with (
+        open(path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+        memoryview(mm) as view,
+        view[start:stop] as window,
+    ):
+        return _search_window(needle, window, start)
+
+
+def _merge(results: Iterable[list[int]]) -> list[int]:
+    """Merge the per-chunk matches into sorted, deduplicated global offsets."""
+    return sorted({i for chunk in results for i in chunk})
+
+
+def _run(
+    fn: Callable[..., list[int]],
+    jobs: list[tuple[Any, ...]],
+    workers: int | None,
+    executor: Executor | None,
+) -> list[int]:
+    """Run `fn` over every job, in a process pool unless there's only one job or worker."""
+    if len(jobs) == 0:
+        return []
+    if executor is not None:
+        return _merge(executor.map(fn, *zip(*jobs)))
+    if workers == 1 or len(jobs) <= 1:
+        return _merge(fn(*job) for job in jobs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _merge(pool.map(fn, *zip(*jobs)))
+
+
+def parallel_findall(
+    needle: Text,
+    haystack: Text,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_PARALLEL_CHUNK_SIZE,
+    executor: Executor | None = None,
+) -> list[int]:
+    """
+    Find every (possibly overlapping) occurrence of `needle` in an in-memory haystack in parallel.
+
+    Each chunk has to be pickled and sent to a worker, so for data that lives in a file prefer
+    `parallel_findall_file`, which lets the workers read the file themselves.
+
+    Args:
+        needle: The substring to search for. This must not be empty.
+        haystack: The string or bytes-like object to search.
+        workers: The number of worker processes. Defaults to the number of CPUs. With a single
+          worker (or a single chunk) the search runs in this process.
+        chunk_size: The number of match start positions each job is responsible for.
+        executor: An existing executor to run the jobs in, so a pool can be reused across calls.
+          `workers` is ignored if this is set.
+
+    Returns:
+        The same offsets as `kmp.kmp_findall(needle, haystack)`, in ascending order.
+    """
+    if workers is not None and workers <= 0:
+        raise ValueError("The number of workers must be positive")
+    if isinstance(haystack, str):
+        bounds = chunk_bounds(len(haystack), len(needle), chunk_size)
+        jobs = [(needle, haystack[start:stop], start) for start, stop in bounds]
+    else:
+        needle = bytes(needle)
+        # Memory views can't be pickled, so the workers get their own copy of each chunk.
+        with memoryview(haystack) as raw, raw.cast("B") as view:
+            bounds = chunk_bounds(len(view), len(needle), chunk_size)
+            jobs = [
+                (needle, view[start:stop].tobytes(), start) for start, stop in bounds
+            ]
+    return _run(_search_window, jobs, workers, executor)
+
+
+def parallel_findall_file(
+    needle: Text,
+    path: str | os.PathLike[str],
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_PARALLEL_CHUNK_SIZE,
+    executor: Executor | None = None,
+) -> list[int]:
+    """
+    Find every (possibly overlapping) occurrence of `needle` in a file in parallel.
+
+    Args:
+        needle: The bytes to search for. This must not be empty.
+        path: The file to search. Each worker memory-maps it and searches its own window in place.
+        workers: The number of worker processes. Defaults to the number of CPUs. With a single
+          worker (or a single chunk) the search runs in this process.
+        chunk_size: The number of match start positions (bytes) each job is responsible for.
+        executor: An existing executor to run the jobs in. `workers` is ignored if this is set.
+
+    Returns:
+        The byte offsets of every match in ascending order, identical to a serial scan.
+    """
+    if workers is not None and workers <= 0:
+        raise ValueError("The number of workers must be positive")
+    if isinstance(needle, str):
+        raise TypeError("Files are searched as bytes, so the needle must be bytes-like")
+    needle = bytes(needle)
+    # An empty file can't be memory mapped, but it also doesn't have any chunks to search.
+    bounds = chunk_bounds(os.path.getsize(path), len(needle), chunk_size)
+    jobs = [(needle, path, start, stop) for start, stop in bounds]
+    return _run(_search_file_window, jobs, workers, executor)
@@ -0,0 +1,142 @@
+"""
+The Rabin-Karp string matching algorithm for many needles of the same length.
+
+We treat every window of $m$ characters in the haystack as a number in base `BASE` modulo `MODULUS`.
+Sliding the window over by one character only takes $O(1)$ arithmetic: subtract the character that
+falls out, shift everything up, and add the character that comes in. If all of the needles have the
+same length, each window hash can be checked against a hash table of every needle, so thousands of
+fixed-length needles (like IDs) are found in a single $O(n)$ pass on average.
+
+Different strings can have the same hash, so every hash hit is verified by comparing the window
+against the needle, which keeps the results exact.
+"""
+
+from collections.abc import Generator, Iterable
+from typing import Final
+
+from aho_corasick import Match
+from kmp import Text
+
+BASE: Final[int] = 1_000_003
+"""The base of the polynomial hash. It's bigger than any byte, and than most code points."""
+
+MODULUS: Final[int] = (1 << 61) - 1
+"""A Mersenne prime, so collisions are very unlikely for non-adversarial input."""
+
+
+def _code(c: str | int) -> int:
+    """The numeric value of a character, which is already an `int` for bytes-like objects."""
+    return ord(c) if isinstance(c, str) else c
+
+
+def polynomial_hash(s: Text) -> int:
+    """
+    Hash `s` the same way `RabinKarp` hashes each window of the haystack.
+    """
+    h = 0
+    for c in s:
+        h = (h * BASE + _code(c)) % MODULUS
+    return h
+
+
+class RabinKarp:
+    """
+    A set of same-length needles, hashed once so they can be searched for in any number of
+    haystacks.
+    """
+
+    def __init__(self, needles: Iterable[Text]) -> None:
+        """
+        Args:
+            needles: The substrings to search for. They must all have the same, non-zero, length,
+              and must either all be `str` or all be bytes-like. Duplicates are ignored.
+        """
+        patterns: list[str | bytes] = []
+        seen: set[str | bytes] = set()
+        for needle in needles:
+            pattern = needle if isinstance(needle, str) else bytes(needle)
+            if pattern not in seen:
+                seen.add(pattern)
+                patterns.append(pattern)
+        if len({len(p) for p in patterns}) > 1:
+            raise ValueError("The needles must all have the same length")
+        if patterns and len(patterns[0]) == 0:
+            raise ValueError("The needles must not be empty")
+        if len({isinstance(p, str) for p in patterns}) > 1:
+            raise TypeError("The needles must all be str or all be bytes-like")
+
+        self.patterns: list[str | bytes] = patterns
+        """The unique needles, in the order they were first given."""
+
+        self.needle_size: int = len(patterns[0]) if patterns else 0
+        """The length of every needle."""
+
+        self._is_text = len(patterns) == 0 or isinstance(patterns[0], str)
+
+        # Most hashes have a single needle, but we have to handle collisions between needles too.
+        self._by_hash: dict[int, list[str | bytes]] = {}
+        for pattern in patterns:
+            self._by_hash.setdefault(polynomial_hash(pattern), []).append(pattern)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def finditer(self, haystack: Text) -> Generator[Match, None, None]:
+        """
+        Find every occurrence of every needle in `haystack` in a single pass.
+
+        Returns:
+            A generator of `(needle, start offset)` pairs in ascending order of offset.
+        """
+        if self.patterns and isinstance(haystack, str) != self._is_text:
+            raise TypeError(
+                "The haystack and the needles must both be str or both be bytes-like"
+            )
+        m = self.needle_size
+        n = len(haystack)
+        if m == 0 or n < m:
+            return
+        by_hash = self._by_hash
+        # The weight of the character that's about to fall out of the window.
+        top = pow(BASE, m - 1, MODULUS)
+
+        h = polynomial_hash(haystack[:m])
+        i = 0
+        while True:
+            candidates = by_hash.get(h)
+            if candidates is not None:
+                window = haystack[i : i + m]
+                for candidate in candidates:
+                    if window == candidate:
+                        yield candidate, i
+                        break
+            if i + m >= n:
+                return
+            h = (
+                (h - _code(haystack[i]) * top) * BASE + _code(haystack[i + m])
+            ) % MODULUS
+            i += 1
+
+    def findall(self, haystack: Text) -> list[Match]:
+        """Eager version of `finditer`."""
+        return list(self.finditer(haystack))
+
+
+def rabin_karp_substr(needle: Text, haystack: Text) -> int:
+    """
+    Uses the Rabin-Karp algorithm to find the starting index where `needle` is in `haystack` (if
+    `haystack` contains `needle`).
+
+    Args:
+        needle: The substring to search for within `haystack`. This must not be an empty string.
+        haystack: The string to search. This must not be an empty string.
+
+    Returns:
+        The start index of where `needle` is in `haystack`. If the substring is not found,
+        this will return `-1`.
+    """
+    if len(haystack) == 0:
+        raise ValueError("The haystack must not be an empty string")
+    if len(needle) == 0:
+        raise ValueError("The needle must not be an empty string")
+    return next((i for _, i in RabinKarp([needle]).finditer(haystack)), -1)
@@ -5,14 +5,16 @@ Good morning! Here's your coding interview problem for today.
 
 This problem was asked by Twitter.
 
-A strobogrammatic number is a positive number that appears the same after being rotated 180 degrees. 
+A strobogrammatic number is a positive number that appears the same after being rotated 180 degrees.
 For example, 16891 is strobogrammatic.
 
 Create a program that finds all strobogrammatic numbers with N digits.
 """
 
 from collections.abc import Generator, Sequence
-from typing import Final, TypeGuard, TypeVar
+from typing import Final, TypeVar
+
+import numpy as np
 
 FLIPPED_CHARS: Final[dict[int, int]] = {
     1: 1,
@@ -25,74 +27,282 @@ T = TypeVar("T")
 
 
 def combinations_with_replacement(
-    xs: Sequence[T], size: int
-) -> Generator[list[T], None, None]:
+    xs: Sequence[T],
+    size: int,
+    start: int = 0,
+    stop: int | None = None,
+    reuse_buffer: bool = False,
+) -> Generator[Sequence[T], None, None]:
+    """
+    Generates every sequence of `size` elements of `xs`, with replacement, where order matters.
+
+    Despite the name, this is the Cartesian product of `xs` with itself `size` times (like
+    `itertools.product(xs, repeat=size)`), so there are `len(xs) ** size` of them. They're
+    generated like an odometer: the sequences are numbered in base `len(xs)`, and we get from one
+    to the next by incrementing the last position and carrying into the earlier ones. That's
+    $O(1)$ amortized work per sequence, and there's no recursion, so `size` isn't limited by the
+    recursion depth.
+
+    Since sequence `i` is just `i` written in base `len(xs)`, we can start from any index. That
+    lets an enumeration be checkpointed and resumed, or split into `[start, stop)` slices across
+    processes.
+
+    Args:
+        xs: A sequence of unique elements.
+        size: The length of each sequence. This must not be negative.
+        start: The index of the first sequence to generate.
+        stop: The index to stop before. Defaults to every sequence after `start`.
+        reuse_buffer: Yield the same list every time, updated in place, instead of a new tuple
+          per sequence. This doesn't allocate anything per sequence, but each one has to be used
+          (or copied) before asking for the next.
+
+    Returns:
+        A generator of the sequences, ordered by the index of each element of `xs` in them, with
+        the first position changing the slowest.
+    """
+    if size < 0:
+        raise ValueError("The size must not be negative")
+    base = len(xs)
+    total = base**size
+    if start < 0:
+        raise ValueError("The start index must not be negative")
+    stop = total if stop is None else min(stop, total)
+    if start >= stop:
+        return
+
+    # Write `start` in base `len(xs)`, most significant position first.
+    indices = [0] * size
+    remaining = start
+    for position in range(size - 1, -1, -1):
+        remaining, indices[position] = divmod(remaining, base)
+    buffer = [xs[i] for i in indices]
+
+    for _ in range(stop - start):
+        yield buffer if reuse_buffer else tuple(buffer)
+        position = size - 1
+        while position >= 0:
+            indices[position] += 1
+            if indices[position] < base:
+                buffer[position] = xs[indices[position]]
+                break
+            indices[position] = 0
+            buffer[position] = xs[0]
+            position -= 1
+
+
+def iter_strobo_nums(
+    n_digits: int, lo: int | None = None, hi: int | None = None
+) -> Generator[list[int], None, None]:
     """
-    Return all permutations of the input list.
+    Lazily generates the strobo numbers with `n_digits` digits in ascending order.
+
+    The first half of the digits determines the whole number, so we walk the choices for the first
+    half depth first, in ascending order of digit, with an explicit stack. A single buffer holds the
+    number being built and every choice writes a digit and its flipped counterpart into it in place,
+    so the working memory is $O(n)$ no matter how many numbers we yield.
+
+    The digits chosen so far are the leading digits of the number, so every number under a prefix
+    $p$ of $d$ digits is in $[p \\cdot 10^{n-d}, (p + 1) \\cdot 10^{n-d})$. We skip a prefix whose
+    interval is entirely below `lo`, and stop as soon as one starts above `hi`, so bounded
+    enumeration only visits the numbers in the range plus $O(n)$ prefixes on each boundary.
 
     Args:
-        xs: An iterable of unique elements.
+        n_digits: The number of digits. This must not be negative.
+        lo: Only yield numbers greater than or equal to this.
+        hi: Only yield numbers less than or equal to this.
+
+    Returns:
+        A generator of the digits of each number, as a new list for every number.
     """
+    if n_digits < 0:
+        raise ValueError("The number of digits must not be negative")
+    if n_digits == 0:
+        yield []
+        return
+    lo = 0 if lo is None else lo
+    hi = 10**n_digits if hi is None else hi
+    digits = sorted(FLIPPED_CHARS)
+    half = (n_digits + 1) // 2
 
-    def helper(current: list[T], depth: int) -> Generator[list[T], None, None]:
-        """
-        Args:
-            current: The combination prefix that's been built up so far.
-            start: The index to start sampling from when adding another element to the prefix.
-            depth: Current recursion depth for this invocation of the method.
-        """
-        if depth == size:
-            yield current
-        else:
-            for i in range(0, len(xs)):
-                next_prefix = current + [xs[i]]
-                yield from helper(next_prefix, depth + 1)
+    current = [0] * n_digits
+    # The index into `digits` chosen at each depth, and the value of the digits before it.
+    choice = [-1] * half
+    prefix = [0] * half
+    depth = 0
+    while depth >= 0:
+        choice[depth] += 1
+        if choice[depth] == len(digits):
+            choice[depth] = -1
+            depth -= 1
+            continue
+        digit = digits[choice[depth]]
+        value = prefix[depth] * 10 + digit
+        span = 10 ** (n_digits - depth - 1)
+        if value * span > hi:
+            # Every later prefix is even bigger.
+            return
+        if (value + 1) * span <= lo:
+            continue
 
-    return helper([], 0)
+        current[depth] = digit
+        mirror = n_digits - depth - 1
+        # Handles the case of an odd number of digits
+        if depth < mirror:
+            current[mirror] = FLIPPED_CHARS[digit]
+        if depth + 1 < half:
+            prefix[depth + 1] = value
+            depth += 1
+            continue
+        # Only numbers on the boundaries of the range need to be checked exactly.
+        if value * span < lo or (value + 1) * span > hi:
+            number = int("".join(map(str, current)))
+            if not lo <= number <= hi:
+                continue
+        yield list(current)
 
 
-def _check_list_has_no_optional(x: Sequence[T | None]) -> TypeGuard[Sequence[T]]:
+def all_strobo_nums(n_digits: int) -> list[list[int]]:
     """
-    This is a convenience method to help the type-checker.
+    Generates all of the possible strobo numbers with `n_digits` digits, in ascending order.
 
-    Checks that some sequence doesn't have any `None` elements
+    This collects `iter_strobo_nums`, which generates the first half of each number and fills out
+    the second half, since that's set by the first half (if we want to make a valid number that can
+    be flipped). There are $O(4^{n/2})$ numbers, and each one takes $O(n)$ to build, so the time
+    and space complexity are both $O(n \\cdot 4^{n/2})$ because we store every result. Use
+    `iter_strobo_nums` directly to only keep $O(n)$ in memory.
     """
-    return not any(map(lambda element: element is None, x))
+    return list(iter_strobo_nums(n_digits))
+
+
+MAX_INT64_DIGITS: Final[int] = 18
+"""Every number with this many digits fits in an `int64`."""
 
 
-def all_strobo_nums(n_digits: int):
+def strobo_nums_array(n_digits: int) -> np.ndarray:
     """
-    Generates all of the possible strobo numbers by generating all possible combinations of the 
-    first half of the sequence recursively, then filling out the second half of the sequence
-    since that's set by the first half (if we want to make a valid number that can be flipped).
+    Generates all of the strobo numbers with `n_digits` digits as integers, in ascending order.
 
-    This solution first generates all permutations of the flipped chars recursively, which is O(5^N),
-    we recurse for every flipped character N times. The space complexity is $O(n)$ since the maximum
-    recursive depth is N.
+    Instead of building each number digit by digit, we build every number at once, one level (pair
+    of digits) at a time. We keep the value of the first `d` digits and the value of the mirrored
+    last `d` digits of every number built so far. Adding a level is an outer product with the
+    allowed digits: the first half gets the digit appended at the bottom, and the second half gets
+    its flipped counterpart prepended at the top. Flattening the product row by row keeps the
+    numbers in ascending order. Finally each number is `first * 10^{n/2} + second`.
 
-    Filling out the second half of the sequence is O(n), so the time complexity is $O(5^n) + O(N)$ and space
-    is $O(5^N) + O(N)$ (because of the recursion stack and the fact that we store every result).
+    That's $O(n)$ vectorized operations over arrays of up to $4^{n/2}$ elements, instead of a list
+    of digits per number.
+
+    Args:
+        n_digits: The number of digits. This must be positive.
+
+    Returns:
+        An `int64` array, or an `object` array of Python `int`s if the numbers have more than
+        `MAX_INT64_DIGITS` digits. The numbers are the same as `all_strobo_nums(n_digits)`.
     """
-    helper_depth = n_digits // 2
+    if n_digits <= 0:
+        raise ValueError("The number of digits must be positive")
+    dtype = np.int64 if n_digits <= MAX_INT64_DIGITS else object
+    digits = np.array(sorted(FLIPPED_CHARS), dtype=dtype)
+    flipped = np.array([FLIPPED_CHARS[d] for d in sorted(FLIPPED_CHARS)], dtype=dtype)
+
+    first = np.zeros(1, dtype=dtype)
+    second = np.zeros(1, dtype=dtype)
+    for level in range(n_digits // 2):
+        first = (first[:, None] * 10 + digits[None, :]).ravel()
+        second = (second[:, None] + flipped[None, :] * 10**level).ravel()
     if n_digits % 2 != 0:
-        helper_depth += 1
-
-    def helper(
-        current: Sequence[int | None], depth: int
-    ) -> Generator[Sequence[int], None, None]:
-        if depth == helper_depth:
-            assert _check_list_has_no_optional(current)
-            yield current
-        else:
-            # Need to make a copy so we're not referencing the exact same list with each invocation
-            for digit, flipped in FLIPPED_CHARS.items():
-                idx_digit = depth
-                idx_flipped = n_digits - depth - 1
-                current = [x for x in current]
-                current[idx_digit] = digit
-                # Handles the case of an odd number of digits
-                if idx_digit < idx_flipped:
-                    current[idx_flipped] = flipped
-                yield from helper(current, depth + 1)
-
-    return list(helper([None] * n_digits, 0))
+        # The middle digit doesn't have a counterpart in the second half.
+        first = (first[:, None] * 10 + digits[None, :]).ravel()
+        second = np.repeat(second, len(digits))
+    return first * 10 ** (n_digits // 2) + second
+
+
+def count_strobo(n_digits: int) -> int:
+    """
+    Counts the strobo numbers with `n_digits` digits without generating them.
+
+    Every digit in the first half (including the middle digit of an odd number of digits) can be
+    any of the `FLIPPED_CHARS`, and the second half is fixed by the first, so there are
+    $|F|^{\\lceil n/2 \\rceil}$ of them.
+    """
+    if n_digits < 0:
+        raise ValueError("The number of digits must not be negative")
+    return len(FLIPPED_CHARS) ** ((n_digits + 1) // 2)
+
+
+def _mirror(first_half: Sequence[int], n_digits: int) -> list[int]:
+    """Fill out the second half of a strobo number from its first half."""
+    second_half = [FLIPPED_CHARS[d] for d in reversed(first_half[: n_digits // 2])]
+    return [*first_half, *second_half]
+
+
+def _count_strobo_at_most(n_digits: int, x: int) -> int:
+    """Counts the strobo numbers with `n_digits` digits that are less than or equal to `x`."""
+    if n_digits == 0 or x < 10 ** (n_digits - 1):
+        return 0
+    if x >= 10**n_digits:
+        return count_strobo(n_digits)
+    digits = sorted(FLIPPED_CHARS)
+    target = [int(c) for c in str(x)]
+    half = (n_digits + 1) // 2
+    count = 0
+    # Walk down the first half of `x`. At each position, every smaller digit we could have picked
+    # instead leaves the rest of the first half free, so all of those numbers are below `x`.
+    for depth in range(half):
+        smaller = sum(d < target[depth] for d in digits)
+        count += smaller * len(digits) ** (half - depth - 1)
+        if target[depth] not in FLIPPED_CHARS:
+            return count
+    # `x` starts with a valid first half, so the only number left is the one it determines.
+    if _mirror(target[:half], n_digits) <= target:
+        count += 1
+    return count
+
+
+def count_strobo_in_range(lo: int, hi: int) -> int:
+    """
+    Counts the strobo numbers (of any number of digits) in `[lo, hi]` without generating them.
+
+    For each number of digits, we count the strobo numbers up to each bound by walking the first
+    half of its digits, which is $O(n)$ per number of digits, so $O(n^2)$ overall for $n$-digit
+    bounds.
+    """
+    if lo > hi:
+        raise ValueError(
+            "The lower bound must be less than or equal to the upper bound"
+        )
+    if hi <= 0:
+        return 0
+    lo = max(lo, 1)
+    return sum(
+        _count_strobo_at_most(n_digits, hi) - _count_strobo_at_most(n_digits, lo - 1)
+        for n_digits in range(len(str(lo)), len(str(hi)) + 1)
+    )
+
+
+def nth_strobo(n_digits: int, k: int) -> list[int]:
+    """
+    Finds the `k`th (from 0) strobo number with `n_digits` digits in ascending order, in $O(n)$.
+
+    The numbers are in the same order as their first halves, and the first halves are every string
+    of `FLIPPED_CHARS` in lexicographic order, so the first half is just `k` written in base
+    $|F|$ with the sorted `FLIPPED_CHARS` as the digits. This makes it easy to page through the
+    numbers, or to split them between workers, without enumerating the ones before.
+
+    Args:
+        n_digits: The number of digits. This must not be negative.
+        k: The index of the number. This must be at least 0 and less than `count_strobo(n_digits)`.
+
+    Returns:
+        The digits of the number, the same as the `k`th element of `all_strobo_nums(n_digits)`.
+    """
+    total = count_strobo(n_digits)
+    if not 0 <= k < total:
+        raise ValueError(f"k must be between 0 and {total - 1}")
+    digits = sorted(FLIPPED_CHARS)
+    first_half: list[int] = []
+    for _ in range((n_digits + 1) // 2):
+        k, digit = divmod(k, len(digits))
+        first_half.append(digits[digit])
+    first_half.reverse()
+    return _mirror(first_half, n_digits)
@@ -1,12 +1,12 @@
 """
 # Prompt
 
-Design and implement a HitCounter class that keeps track of requests (or hits). It should support 
+Design and implement a HitCounter class that keeps track of requests (or hits). It should support
 the following operations:
 
     `record(timestamp)`: records a hit that happened at timestamp
     `total()`: returns the total number of hits recorded
-    `range(lower, upper)`: returns the number of hits that occurred between timestamps lower and 
+    `range(lower, upper)`: returns the number of hits that occurred between timestamps lower and
       upper (inclusive)
 
 # Followup
@@ -39,11 +39,28 @@ and the user queries for the number of hits between 0 and 2.5 ms, you can just g
 in the 1-2ms bucket, and then query the 2-3 ms bucket with more granularity.
 """
 
+import asyncio
 import bisect
+import heapq
+import math
+import mmap
+import os
+import struct
+import threading
+import weakref
+from array import array
+from collections.abc import Buffer, Iterable, Iterator, Sequence
 from dataclasses import dataclass
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from types import TracebackType
+from typing import Final, Self
 
+import numpy as np
 
-@dataclass
+
+@dataclass(slots=True)
 class Node:
     """
     A node in a tree for tracking hits.
@@ -52,32 +69,543 @@ class Node:
     timestamp: int
     """The timestamp the hit corresponds to."""
 
-    count: int
+    count: int = 1
     """The number of hits that correspond to the timestamp."""
 
-    descendant_conut: int
-    # TODO: not sure if we want to maintain this, is it really worth it over a traversal?
-    """The number of descendants under this node, exluding itself."""
+    descendant_count: int = 0
+    """
+    The number of hits recorded under this node, excluding its own.
+
+    Keeping this up to date costs $O(1)$ per node on the insertion path, and it's what lets us count
+    the hits on one side of a timestamp in $O(log n)$ instead of traversing the subtree.
+    """
+
+    height: int = 1
+    """The height of the subtree rooted at this node, used to keep the tree balanced."""
+
+    left: "Node | None" = None
+    """The subtree with the earlier timestamps."""
+
+    right: "Node | None" = None
+    """The subtree with the later timestamps."""
+
+    @property
+    def subtree_count(self) -> int:
+        """The number of hits in the subtree rooted at this node, including its own."""
+        return self.count + self.descendant_count
+
+
+def _height(node: Node | None) -> int:
+    return 0 if node is None else node.height
+
+
+def _subtree_count(node: Node | None) -> int:
+    return 0 if node is None else node.subtree_count
+
+
+def _update(node: Node) -> None:
+    """Recompute the cached height and descendant count from the node's children."""
+    node.height = 1 + max(_height(node.left), _height(node.right))
+    node.descendant_count = _subtree_count(node.left) + _subtree_count(node.right)
+
+
+def _rotate_right(node: Node) -> Node:
+    pivot = node.left
+    assert pivot is not None
+    node.left = pivot.right
+    pivot.right = node
+    _update(node)
+    _update(pivot)
+    return pivot
+
 
+def _rotate_left(node: Node) -> Node:
+    pivot = node.right
+    assert pivot is not None
+    node.right = pivot.left
+    pivot.left = node
+    _update(node)
+    _update(pivot)
+    return pivot
 
-class BTree[T]:
-    """A binary node."""
 
-    def __init__(self):
-        self.root = None
+def _rebalance(node: Node) -> Node:
+    """Restore the AVL invariant (child heights differ by at most one) at `node`."""
+    _update(node)
+    balance = _height(node.left) - _height(node.right)
+    if balance > 1:
+        assert node.left is not None
+        if _height(node.left.left) < _height(node.left.right):
+            node.left = _rotate_left(node.left)
+        return _rotate_right(node)
+    if balance < -1:
+        assert node.right is not None
+        if _height(node.right.right) < _height(node.right.left):
+            node.right = _rotate_right(node.right)
+        return _rotate_left(node)
+    return node
+
+
+class BTree:
+    """
+    A balanced (AVL) binary search tree of timestamps and how many hits each one has.
+
+    Every node caches how many hits are below it, so inserting and counting the hits before some
+    timestamp are both $O(log n)$ for $n$ distinct timestamps.
+    """
+
+    def __init__(self) -> None:
+        self.root: Node | None = None
         """
         The root node.
 
         Initially set to `None` if the binary tree isn't initialized.
         """
 
+        self.size = 0
+        """The number of nodes (distinct timestamps) in the tree."""
+
+    @classmethod
+    def from_sorted(cls, pairs: Sequence[tuple[int, int]]) -> "BTree":
+        """
+        Build a perfectly balanced tree in $O(n)$.
+
+        Args:
+            pairs: `(timestamp, count)` pairs in strictly ascending order of timestamp.
+        """
+
+        def helper(lo: int, hi: int) -> Node | None:
+            if lo >= hi:
+                return None
+            mid = (lo + hi) // 2
+            node = Node(pairs[mid][0], pairs[mid][1])
+            node.left = helper(lo, mid)
+            node.right = helper(mid + 1, hi)
+            _update(node)
+            return node
+
+        tree = cls()
+        tree.root = helper(0, len(pairs))
+        tree.size = len(pairs)
+        return tree
+
+    @property
+    def total(self) -> int:
+        """The number of hits in the tree."""
+        return _subtree_count(self.root)
+
+    def insert(self, timestamp: int, count: int = 1) -> None:
+        """Add `count` hits at `timestamp`."""
+        # Walk down iteratively, remembering the path so we can fix up the ancestors afterwards.
+        path: list[Node] = []
+        node = self.root
+        while node is not None:
+            if timestamp == node.timestamp:
+                # The common case for real traffic: the timestamp already has a node, so the shape
+                # of the tree doesn't change and we only need to bump the counts.
+                node.count += count
+                for ancestor in path:
+                    ancestor.descendant_count += count
+                return
+            path.append(node)
+            node = node.left if timestamp < node.timestamp else node.right
+
+        child = Node(timestamp, count)
+        self.size += 1
+        if not path:
+            self.root = child
+            return
+        parent = path[-1]
+        if timestamp < parent.timestamp:
+            parent.left = child
+        else:
+            parent.right = child
+
+        # Rebalance bottom up. Once a subtree keeps its height without a rotation, nothing above it
+        # can become unbalanced, so the remaining ancestors only need their counts bumped.
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            old_height = node.height
+            balanced = _rebalance(node)
+            if i == 0:
+                self.root = balanced
+            elif path[i - 1].left is node:
+                path[i - 1].left = balanced
+            else:
+                path[i - 1].right = balanced
+            if balanced is node and node.height == old_height:
+                for ancestor in path[:i]:
+                    ancestor.descendant_count += count
+                return
+
+    def count_before(self, timestamp: int, inclusive: bool) -> int:
+        """
+        Count the hits before `timestamp`.
+
+        Args:
+            timestamp: The timestamp to count up to.
+            inclusive: Whether to include the hits at exactly `timestamp`.
+        """
+        total = 0
+        node = self.root
+        while node is not None:
+            if timestamp < node.timestamp:
+                node = node.left
+            elif timestamp > node.timestamp:
+                total += _subtree_count(node.left) + node.count
+                node = node.right
+            else:
+                total += _subtree_count(node.left)
+                if inclusive:
+                    total += node.count
+                break
+        return total
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        """Iterate over `(timestamp, count)` pairs in ascending order of timestamp."""
+        stack: list[Node] = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.timestamp, node.count
+            node = node.right
+
 
 class HitCounter:
     """Keeps track of requests/hits and allows for basic queries in a time span."""
 
     def __init__(self) -> None:
-        self.recorded_timestamps: list[int] = list()
-        """All of the timestamps that have been recorded so far."""
+        self._tree = BTree()
+
+    @property
+    def recorded_timestamps(self) -> list[int]:
+        """All of the timestamps that have been recorded so far, in ascending order."""
+        return [ts for ts, count in self._tree for _ in range(count)]
+
+    def record(self, timestamp: int) -> None:
+        """
+        Record a hit that happened at `timestamp`.
+
+        Args:
+            timestamp: A unix timestamp. This must be a non-negative integer.
+        """
+        if timestamp < 0:
+            raise ValueError("Unix epoch timestamp must not be negative.")
+        # $O(log n)$ since the tree stays balanced, unlike inserting into a sorted list, which can
+        # be $O(n)$ if Python has to shuffle the entire list.
+        self._tree.insert(timestamp)
+
+    def record_many(self, timestamps: Iterable[int] | Buffer) -> None:
+        """
+        Record a batch of hits at once.
+
+        The whole batch is validated before anything is recorded, so a bad timestamp doesn't leave
+        the counter with half of the batch. The batch is sorted and grouped by timestamp once. If
+        it's small compared to the counter, each distinct timestamp is inserted into the tree.
+        Otherwise the batch is merged with the existing timestamps in a single linear pass and the
+        tree is rebuilt from the result.
+
+        Args:
+            timestamps: Unix timestamps, which must all be non-negative integers. Buffers of
+              integers (`array("q")`, NumPy arrays, ...) are sorted and grouped with NumPy, so we
+              only create Python `int`s for the distinct timestamps.
+        """
+        if isinstance(timestamps, Buffer):
+            batch = np.asarray(memoryview(timestamps))
+            if batch.dtype.kind not in "iu":
+                raise TypeError("Timestamp buffers must contain integers")
+            batch = batch.ravel()
+            if batch.size > 0 and batch.min() < 0:
+                raise ValueError("Unix epoch timestamp must not be negative.")
+            unique, counts = np.unique(batch, return_counts=True)
+            pairs = list(zip(unique.tolist(), counts.tolist()))
+        else:
+            ordered = sorted(timestamps)
+            if ordered and ordered[0] < 0:
+                raise ValueError("Unix epoch timestamp must not be negative.")
+            pairs = [(ts, len(list(group))) for ts, group in groupby(ordered)]
+
+        tree = self._tree
+        # Inserting costs $O(k log n)$ and rebuilding costs $O(n + k)$, so pick the cheaper one.
+        if len(pairs) * max(tree.size.bit_length(), 1) < tree.size + len(pairs):
+            for ts, count in pairs:
+                tree.insert(ts, count)
+            return
+        merged = [
+            (ts, sum(count for _, count in group))
+            for ts, group in groupby(heapq.merge(tree, pairs), key=itemgetter(0))
+        ]
+        self._tree = BTree.from_sorted(merged)
+
+    @property
+    def total(self) -> int:
+        """The total number of hits recorded."""
+        return self._tree.total
+
+    def range(self, lower_bound: int, upper_bound: int) -> int:
+        """
+        Return the total number of hits that happened in some range.
+
+        Args:
+            lower_bound: The lower bound to get the hits for, inclusive. This must be less than
+              or equal to `upper_bound`.
+            upper_bound: The upper bound to get the hits for, inclusive. This must be greater than
+              or equal to `lower_bound`.
+        """
+        if lower_bound > upper_bound:
+            raise ValueError(
+                "The lower bound must be less than or equal to the upper bound"
+            )
+        upper_count = self._tree.count_before(upper_bound, inclusive=True)
+        lower_count = self._tree.count_before(lower_bound, inclusive=False)
+        return upper_count - lower_count
+
+    def __len__(self) -> int:
+        return self.total
+
+
+class ConcurrentHitCounter:
+    """
+    A `HitCounter` that many threads can record hits into at once.
+
+    Wrapping a `HitCounter` in a lock makes every `record` contend for it. Instead, each thread
+    appends its hits to its own buffer, which doesn't need a lock since appending to a list is
+    atomic. Queries take the lock, drain every buffer into the underlying counter with
+    `record_many`, and then answer from it, so a query sees every `record` that returned before it
+    started. Draining only removes the hits it copied, so hits appended concurrently are kept for
+    the next query.
+
+    A thread also drains its own buffer once it holds `max_buffered` hits, which bounds the memory
+    used by the buffers when nobody queries for a while. Buffers are registered with a weak
+    reference to their thread, and queries drop the buffers of threads that had exited before the
+    query drained them, so servers that start a thread per request don't accumulate buffers.
+    """
+
+    def __init__(self, max_buffered: int = 4096) -> None:
+        """
+        Args:
+            max_buffered: The most hits a thread buffers before merging them itself. This must be
+              positive.
+        """
+        if max_buffered <= 0:
+            raise ValueError("The buffer size must be positive")
+        self.max_buffered = max_buffered
+        """The most hits a thread buffers before merging them itself."""
+
+        self._counter = HitCounter()
+        self._lock = threading.Lock()
+        """Guards `_counter` and `_buffers`."""
+
+        self._local = threading.local()
+        self._buffers: list[tuple[weakref.ref[threading.Thread], list[int]]] = []
+        """Every live thread that has recorded a hit, and its buffer."""
+
+    def _buffer(self) -> list[int]:
+        """This thread's buffer, registering a new one on the thread's first hit."""
+        try:
+            return self._local.buffer
+        except AttributeError:
+            buffer: list[int] = []
+            thread = weakref.ref(threading.current_thread())
+            with self._lock:
+                self._buffers.append((thread, buffer))
+            self._local.buffer = buffer
+            return buffer
+
+    def record(self, timestamp: int) -> None:
+        """
+        Record a hit that happened at `timestamp`.
+
+        Args:
+            timestamp: A unix timestamp. This must be a non-negative integer.
+        """
+        if timestamp < 0:
+            raise ValueError("Unix epoch timestamp must not be negative.")
+        buffer = self._buffer()
+        buffer.append(timestamp)
+        if len(buffer) >= self.max_buffered:
+            with self._lock:
+                self._drain(buffer)
+
+    def _drain(self, buffer: list[int]) -> None:
+        """Move the hits in `buffer` into the counter. The lock must be held."""
+        # Other threads only ever append, so the first `n` hits are safe to take and remove.
+        n = len(buffer)
+        if n == 0:
+            return
+        batch = buffer[:n]
+        del buffer[:n]
+        self._counter.record_many(batch)
+
+    def _sync(self) -> HitCounter:
+        """Drain every buffer and forget the ones of exited threads. The lock must be held."""
+        # A thread may append and exit while we drain, so only a thread that had already exited
+        # before the drain is known to have nothing left in its buffer afterwards.
+        alive = [
+            (thread := ref()) is not None and thread.is_alive()
+            for ref, _ in self._buffers
+        ]
+        for _, buffer in self._buffers:
+            self._drain(buffer)
+        self._buffers = [
+            entry for entry, keep in zip(self._buffers, alive, strict=True) if keep
+        ]
+        return self._counter
+
+    @property
+    def total(self) -> int:
+        """The total number of hits recorded."""
+        with self._lock:
+            return self._sync().total
+
+    def range(self, lower_bound: int, upper_bound: int) -> int:
+        """
+        Return the total number of hits that happened in some range.
+
+        Args:
+            lower_bound: The lower bound to get the hits for, inclusive. This must be less than
+              or equal to `upper_bound`.
+            upper_bound: The upper bound to get the hits for, inclusive. This must be greater than
+              or equal to `lower_bound`.
+        """
+        with self._lock:
+            return self._sync().range(lower_bound, upper_bound)
+
+    def __len__(self) -> int:
+        return self.total
+
+
+class AsyncHitCounter:
+    """
+    An asyncio facade over `ConcurrentHitCounter`.
+
+    Recording only appends to the calling thread's buffer, so it's cheap enough to do on the event
+    loop. Queries may have to merge a lot of buffered hits, so they run in a worker thread to keep
+    the event loop responsive.
+    """
+
+    def __init__(self, counter: ConcurrentHitCounter | None = None) -> None:
+        """
+        Args:
+            counter: The counter to wrap, which can be shared with threads that record hits
+              synchronously. Defaults to a new one.
+        """
+        self.counter = ConcurrentHitCounter() if counter is None else counter
+        """The underlying counter."""
+
+    async def record(self, timestamp: int) -> None:
+        """Record a hit that happened at `timestamp`."""
+        self.counter.record(timestamp)
+
+    async def total(self) -> int:
+        """The total number of hits recorded."""
+        return await asyncio.to_thread(lambda: self.counter.total)
+
+    async def range(self, lower_bound: int, upper_bound: int) -> int:
+        """Return the total number of hits between the two bounds, inclusive."""
+        return await asyncio.to_thread(self.counter.range, lower_bound, upper_bound)
+
+
+SEGMENT_MAGIC: Final[bytes] = b"HITS"
+"""The first bytes of every segment file written by `BucketedHitCounter`."""
+
+SEGMENT_VERSION: Final[int] = 1
+"""The version of the segment file format."""
+
+_SEGMENT_HEADER: Final[struct.Struct] = struct.Struct("<4sIqQq")
+"""Magic, version, bucket index, number of timestamps, bucket width. The header is 32 bytes, so the
+timestamps after it are aligned."""
+
+
+class BucketedHitCounter:
+    """
+    A hit counter for when the hits don't fit in memory. This is the followup from the prompt.
+
+    Time is divided into buckets of `bucket_width`. New hits are kept in memory, sorted per bucket,
+    until there are more than `max_resident_hits` of them. Then the oldest buckets are sealed: their
+    hits are written to a segment file, which starts with a header that has the number of hits in
+    it, followed by the sorted timestamps. A bucket that gets more hits after it was sealed just gets
+    another segment. Hits that are still in memory are only written out by `flush` or `close`, so
+    close the counter (or use it as a context manager) when you're done with it.
+
+    We only keep the per-bucket counts in memory, so `range` can count every bucket that the query
+    covers completely without touching the disk. Only the (at most two) buckets at the edges of
+    the query are searched granularly, by memory mapping their segments and binary searching them.
+
+    Segments are never deleted, so creating a counter on an existing directory picks up the hits
+    that were recorded there before. Every segment records the bucket width it was written with,
+    since its bucket index means nothing with a different width.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        bucket_width: int,
+        max_resident_hits: int = 1 << 20,
+    ) -> None:
+        """
+        Args:
+            directory: Where to store the segment files. It's created if it doesn't exist.
+            bucket_width: The width of each time bucket. This must be positive.
+            max_resident_hits: The most hits to keep in memory before flushing buckets to disk.
+              This must be positive.
+        """
+        if bucket_width <= 0:
+            raise ValueError("The bucket width must be positive")
+        if max_resident_hits <= 0:
+            raise ValueError("The maximum number of resident hits must be positive")
+        self.directory = Path(directory)
+        """Where the segment files are stored."""
+
+        self.bucket_width = bucket_width
+        """The width of each time bucket."""
+
+        self.max_resident_hits = max_resident_hits
+        """The most hits that are kept in memory at once."""
+
+        self._resident: dict[int, list[int]] = {}
+        """The sorted hits that haven't been flushed yet, by bucket."""
+
+        self._resident_count = 0
+
+        self._bucket_counts: dict[int, int] = {}
+        """The total number of hits in each bucket, on disk and in memory."""
+
+        self._bucket_ids: list[int] = []
+        """Every bucket that has any hits, in ascending order."""
+
+        self._segments: dict[int, list[Path]] = {}
+        """The segment files for each bucket."""
+
+        self._total = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for path in sorted(self.directory.glob("*.seg")):
+            with path.open("rb") as f:
+                header = f.read(_SEGMENT_HEADER.size)
+            if len(header) < _SEGMENT_HEADER.size:
+                raise ValueError(f"{path} is not a hit counter segment")
+            magic, version, bucket, count, width = _SEGMENT_HEADER.unpack(header)
+            if magic != SEGMENT_MAGIC or version != SEGMENT_VERSION:
+                raise ValueError(
+                    f"{path} is not a version {SEGMENT_VERSION} hit counter segment"
+                )
+            if width != bucket_width:
+                raise ValueError(
+                    f"{path} was written with a bucket width of {width}, not {bucket_width}"
+                )
+            self._add_to_bucket(bucket, count)
+            self._segments.setdefault(bucket, []).append(path)
+
+    def _add_to_bucket(self, bucket: int, count: int) -> None:
+        if bucket not in self._bucket_counts:
+            bisect.insort(self._bucket_ids, bucket)
+            self._bucket_counts[bucket] = 0
+        self._bucket_counts[bucket] += count
+        self._total += count
 
     def record(self, timestamp: int) -> None:
         """
@@ -88,14 +616,88 @@ class HitCounter:
         """
         if timestamp < 0:
             raise ValueError("Unix epoch timestamp must not be negative.")
-        insertion_idx = bisect.bisect_left(self.recorded_timestamps, timestamp)
-        # Technically can be $O(n)$ if Python has to shuffle the entire list.
-        self.recorded_timestamps.insert(insertion_idx, timestamp)
+        bucket = timestamp // self.bucket_width
+        # Buckets are small compared to the whole history, so inserting into a sorted list is fine.
+        bisect.insort(self._resident.setdefault(bucket, []), timestamp)
+        self._resident_count += 1
+        self._add_to_bucket(bucket, 1)
+        if self._resident_count > self.max_resident_hits:
+            self.flush(self.max_resident_hits // 2)
+
+    def flush(self, keep: int = 0) -> None:
+        """
+        Seal the oldest resident buckets to disk until at most `keep` hits are left in memory.
+
+        Flushing down to half of the budget (which `record` does) means we don't write a tiny
+        segment for every hit once we're at the limit.
+        """
+        for bucket in sorted(self._resident):
+            if self._resident_count <= keep:
+                break
+            hits = self._resident.pop(bucket)
+            segments = self._segments.setdefault(bucket, [])
+            path = self.directory / f"{bucket:020d}-{len(segments):06d}.seg"
+            with path.open("wb") as f:
+                f.write(
+                    _SEGMENT_HEADER.pack(
+                        SEGMENT_MAGIC,
+                        SEGMENT_VERSION,
+                        bucket,
+                        len(hits),
+                        self.bucket_width,
+                    )
+                )
+                f.write(array("q", hits).tobytes())
+            segments.append(path)
+            self._resident_count -= len(hits)
+
+    def close(self) -> None:
+        """Write every hit that's still in memory to disk, so reopening the directory sees it."""
+        self.flush()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    @property
+    def resident_hits(self) -> int:
+        """The number of hits currently held in memory."""
+        return self._resident_count
 
     @property
     def total(self) -> int:
         """The total number of hits recorded."""
-        return len(self.recorded_timestamps)
+        return self._total
+
+    def _count_in_bucket(self, bucket: int, lower_bound: int, upper_bound: int) -> int:
+        """Count the hits in `[lower_bound, upper_bound]` that are in a single bucket."""
+        start = bucket * self.bucket_width
+        if lower_bound <= start and start + self.bucket_width - 1 <= upper_bound:
+            # The whole bucket is covered, so the metadata is enough.
+            return self._bucket_counts.get(bucket, 0)
+
+        resident = self._resident.get(bucket, [])
+        count = bisect.bisect_right(resident, upper_bound) - bisect.bisect_left(
+            resident, lower_bound
+        )
+        for path in self._segments.get(bucket, []):
+            with (
+                path.open("rb") as f,
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+                memoryview(mm) as raw,
+                raw[_SEGMENT_HEADER.size :].cast("q") as hits,
+            ):
+                count += bisect.bisect_right(hits, upper_bound) - bisect.bisect_left(
+                    hits, lower_bound
+                )
+        return count
 
     def range(self, lower_bound: int, upper_bound: int) -> int:
         """
@@ -111,9 +713,360 @@ class HitCounter:
             raise ValueError(
                 "The lower bound must be less than or equal to the upper bound"
             )
-        lower_idx = bisect.bisect_left(self.recorded_timestamps, lower_bound)
-        upper_idx = bisect.bisect_right(self.recorded_timestamps, upper_bound)
-        return upper_idx - lower_idx
+        if upper_bound < 0:
+            return 0
+        first = max(lower_bound, 0) // self.bucket_width
+        last = upper_bound // self.bucket_width
+        if first == last:
+            return self._count_in_bucket(first, lower_bound, upper_bound)
+
+        count = self._count_in_bucket(first, lower_bound, upper_bound)
+        count += self._count_in_bucket(last, lower_bound, upper_bound)
+        lo = bisect.bisect_right(self._bucket_ids, first)
+        hi = bisect.bisect_left(self._bucket_ids, last)
+        for bucket in self._bucket_ids[lo:hi]:
+            count += self._bucket_counts[bucket]
+        return count
+
+    def __len__(self) -> int:
+        return self.total
+
+
+class WindowedHitCounter:
+    """
+    A hit counter that only answers "how many hits in the last `window` seconds" questions, for
+    windows up to some `horizon`, in constant memory.
+
+    Time is divided into buckets of `resolution`, and we keep a ring of the most recent buckets,
+    which is just enough to cover the horizon. Instead of the number of hits in each bucket, every
+    slot holds the cumulative number of hits recorded up to the end of its bucket. The hits in any
+    window are then the difference of two slots, so `count_last` is $O(1)$ no matter how wide the
+    window is. When time moves on, the slots of buckets that fall out of the horizon are reused for
+    the new ones, which is what evicts the old hits.
+
+    Hits that arrive in order (the common case) are $O(1)$ to record. A hit that arrives `d`
+    buckets late has to bump the cumulative count of the `d` newer buckets too, so it's $O(d)$.
+    Hits that are older than the horizon can never be part of an answer, so they're dropped.
+    """
+
+    def __init__(self, horizon: int, resolution: int = 1) -> None:
+        """
+        Args:
+            horizon: The widest window that can be queried. This must be positive.
+            resolution: The width of each bucket. `count_last` counts whole buckets, so it's
+              exact when this is 1, or when `window` and `now + 1` are multiples of it. This must
+              be positive.
+        """
+        if horizon <= 0:
+            raise ValueError("The horizon must be positive")
+        if resolution <= 0:
+            raise ValueError("The resolution must be positive")
+        self.horizon = horizon
+        """The widest window that can be queried."""
+
+        self.resolution = resolution
+        """The width of each bucket."""
+
+        # One extra slot, so the bucket just before the widest window is still around to subtract.
+        self._size = -(-horizon // resolution) + 1
+        self._buckets = [-1] * self._size
+        """The bucket in each slot of the ring."""
+
+        self._cumulative = [0] * self._size
+        """The number of hits recorded up to the end of the bucket in each slot."""
+
+        self._first: int | None = None
+        """The oldest bucket that has ever been recorded, since there's nothing before it."""
+
+        self._newest = -1
+        self._latest = -1
+        """The latest timestamp that has been recorded."""
+
+        self._total = 0
+        self._expired = 0
+
+    @property
+    def total(self) -> int:
+        """The number of hits recorded, including the ones that have since been evicted."""
+        return self._total
+
+    @property
+    def expired_hits(self) -> int:
+        """The number of hits that were dropped because they arrived after the horizon passed."""
+        return self._expired
+
+    def record(self, timestamp: int) -> None:
+        """
+        Record a hit that happened at `timestamp`.
+
+        Args:
+            timestamp: A unix timestamp. This must be a non-negative integer.
+        """
+        if timestamp < 0:
+            raise ValueError("Unix epoch timestamp must not be negative.")
+        size = self._size
+        buckets = self._buckets
+        cumulative = self._cumulative
+        bucket = timestamp // self.resolution
+
+        if self._first is None:
+            self._first = self._newest = bucket
+            buckets[bucket % size] = bucket
+        elif bucket > self._newest:
+            # Move the ring forward. Buckets without any hits still need a slot, holding the same
+            # cumulative count as the bucket before them. Only the last `size` of them matter.
+            for b in range(max(self._newest + 1, bucket - size + 1), bucket + 1):
+                buckets[b % size] = b
+                cumulative[b % size] = self._total
+            self._newest = bucket
+        elif bucket <= self._newest - size:
+            self._expired += 1
+            return
+        elif bucket < self._first:
+            # Late hits from before the first bucket need slots for the (empty) buckets in between.
+            for b in range(bucket, self._first):
+                buckets[b % size] = b
+                cumulative[b % size] = 0
+            self._first = bucket
+
+        for b in range(bucket, self._newest + 1):
+            cumulative[b % size] += 1
+        self._total += 1
+        self._latest = max(self._latest, timestamp)
+
+    def _count_through(self, bucket: int) -> int:
+        """The number of hits recorded up to the end of `bucket`."""
+        if self._first is None or bucket < self._first:
+            return 0
+        if bucket >= self._newest:
+            return self._total
+        slot = bucket % self._size
+        if self._buckets[slot] != bucket:
+            raise ValueError("The window reaches further back than the horizon")
+        return self._cumulative[slot]
+
+    def count_last(self, window: int, now: int | None = None) -> int:
+        """
+        Count the hits in the last `window` seconds, in $O(1)$.
+
+        Args:
+            window: The width of the window. This must be positive and at most `horizon`.
+            now: The end of the window, inclusive. Defaults to the latest recorded timestamp. It
+              can be later than that (e.g. the current time), but if it's earlier the window must
+              still be within `horizon` of the latest timestamp.
+
+        Returns:
+            The number of hits with `now - window < timestamp <= now`.
+        """
+        if not 0 < window <= self.horizon:
+            raise ValueError("The window must be positive and at most the horizon")
+        if now is None:
+            now = self._latest
+        if now < 0:
+            return 0
+        upper = now // self.resolution
+        lower = (now - window) // self.resolution
+        if lower >= upper:
+            return 0
+        return self._count_through(upper) - self._count_through(lower)
+
+    def __len__(self) -> int:
+        return self.total
+
+
+_HASH_PRIME: Final[int] = (1 << 31) - 1
+"""The prime for the sketch's hash functions. It's small enough that `a * x + b` fits in 64 bits."""
+
+
+class ApproximateHitCounter:
+    """
+    A hit counter that uses a fixed amount of memory no matter how many hits it records, at the
+    cost of approximate answers.
+
+    This is a dyadic count-min sketch. Level $L$ counts the hits in each aligned block of $2^L$
+    timestamps, i.e. by `timestamp >> L`. Any range of timestamps can be split into at most two
+    blocks per level, so a range count is the sum of at most $2b$ block counts for $b$-bit
+    timestamps. The coarse levels have few enough blocks to count each of them exactly. The finer
+    levels each have a count-min sketch: `depth` rows of `width` counters, where each row hashes a
+    block to one of its counters. Collisions can only add hits, so the smallest counter out of the
+    rows is the best estimate, and it's never too low.
+
+    With `width` $= \\lceil 2be / \\epsilon \\rceil$ and `depth` $= \\lceil \\ln(2b / \\delta)
+    \\rceil$, each block count is within $\\epsilon n / 2b$ of the truth with probability at least
+    $1 - \\delta / 2b$ for $n$ hits, so by the union bound a range count is within $\\epsilon n$
+    with probability at least $1 - \\delta$. The memory is $O(b \\cdot$ `width` $\\cdot$ `depth`$)$
+    counters, independent of $n$.
+    """
+
+    def __init__(
+        self,
+        epsilon: float = 0.01,
+        delta: float = 0.01,
+        bits: int = 32,
+        seed: int | None = None,
+    ) -> None:
+        """
+        Args:
+            epsilon: The error of `range`, as a fraction of the total number of hits. This must be
+              between 0 and 1.
+            delta: The probability that `range` is off by more than that. This must be between 0
+              and 1.
+            bits: Timestamps must be less than `2 ** bits`. The default covers unix timestamps in
+              seconds until 2106. This must be between 1 and 62.
+            seed: Seeds the hash functions, for reproducible estimates.
+        """
+        if not 0 < epsilon < 1:
+            raise ValueError("epsilon must be between 0 and 1")
+        if not 0 < delta < 1:
+            raise ValueError("delta must be between 0 and 1")
+        if not 1 <= bits <= 62:
+            raise ValueError("The number of bits must be between 1 and 62")
+        self.epsilon = epsilon
+        """The error of `range`, as a fraction of the total number of hits."""
+
+        self.delta = delta
+        """The probability that `range` is off by more than `epsilon` times the total."""
+
+        self.bits = bits
+        """Timestamps must be less than `2 ** bits`."""
+
+        self.width = math.ceil(2 * bits * math.e / epsilon)
+        """The number of counters in each row of a sketch."""
+
+        self.depth = math.ceil(math.log(2 * bits / delta))
+        """The number of rows (hash functions) in each sketch."""
+
+        levels = np.arange(bits + 1)
+        blocks = 2 ** (bits - levels)
+        # Levels with no more blocks than a row has counters are cheaper to count exactly.
+        exact = levels[blocks <= self.width]
+        self._sketched = levels[blocks > self.width]
+        self._exact = exact
+        self._exact_offsets = np.concatenate(([0], np.cumsum(blocks[exact])))[:-1]
+        self._exact_counts = np.zeros(int(blocks[exact].sum()), dtype=np.int64)
+        self._sketch_counts = np.zeros(
+            (len(self._sketched), self.depth, self.width), dtype=np.int64
+        )
+        rng = np.random.default_rng(seed)
+        shape = (len(self._sketched), self.depth)
+        self._a = rng.integers(1, _HASH_PRIME, size=shape, dtype=np.int64)
+        self._b = rng.integers(0, _HASH_PRIME, size=shape, dtype=np.int64)
+        self._rows = np.arange(self.depth)
+        self._total = 0
+
+    @property
+    def memory_bytes(self) -> int:
+        """The memory used by the counters, which doesn't depend on the number of hits."""
+        return self._exact_counts.nbytes + self._sketch_counts.nbytes
+
+    def _hash(self, blocks: np.ndarray) -> np.ndarray:
+        """
+        Hash the blocks of every sketched level to counters.
+
+        Args:
+            blocks: The block index at each sketched level, with shape `(levels, ...)`.
+
+        Returns:
+            The counter for each row, with shape `(levels, depth, ...)`.
+        """
+        extra = (1,) * (blocks.ndim - 1)
+        a = self._a.reshape(self._a.shape + extra)
+        b = self._b.reshape(self._b.shape + extra)
+        x = (blocks % _HASH_PRIME)[:, None]
+        return (a * x + b) % _HASH_PRIME % self.width
+
+    def record(self, timestamp: int) -> None:
+        """
+        Record a hit that happened at `timestamp`.
+
+        Args:
+            timestamp: A unix timestamp. This must be a non-negative integer less than
+              `2 ** bits`.
+        """
+        self.record_many([timestamp])
+
+    def record_many(self, timestamps: Iterable[int] | Buffer) -> None:
+        """
+        Record a batch of hits at once, updating every level with a few vectorized operations.
+
+        Args:
+            timestamps: Unix timestamps, which must all be non-negative integers less than
+              `2 ** bits`.
+        """
+        if isinstance(timestamps, Buffer):
+            batch = np.asarray(memoryview(timestamps)).ravel()
+            if batch.dtype.kind not in "iu":
+                raise TypeError("Timestamp buffers must contain integers")
+        else:
+            batch = np.fromiter(timestamps, dtype=object)
+        if batch.size == 0:
+            return
+        if batch.min() < 0:
+            raise ValueError("Unix epoch timestamp must not be negative.")
+        if batch.max() >= 1 << self.bits:
+            raise ValueError(f"Timestamps must be less than 2 ** {self.bits}")
+        batch = batch.astype(np.int64)
+
+        exact = self._exact_offsets[:, None] + (batch >> self._exact[:, None])
+        np.add.at(self._exact_counts, exact.ravel(), 1)
+
+        blocks = batch >> self._sketched[:, None]
+        counters = self._hash(blocks)
+        levels = np.arange(len(self._sketched))[:, None, None]
+        np.add.at(self._sketch_counts, (levels, self._rows[:, None], counters), 1)
+        self._total += batch.size
+
+    @property
+    def total(self) -> int:
+        """The total number of hits recorded. This is always exact."""
+        return self._total
+
+    def range(self, lower_bound: int, upper_bound: int) -> int:
+        """
+        Estimate the total number of hits that happened in some range.
+
+        The estimate is never lower than the true count, and with probability at least
+        `1 - delta` it's at most `epsilon * total` higher.
+
+        Args:
+            lower_bound: The lower bound to get the hits for, inclusive. This must be less than
+              or equal to `upper_bound`.
+            upper_bound: The upper bound to get the hits for, inclusive. This must be greater than
+              or equal to `lower_bound`.
+        """
+        if lower_bound > upper_bound:
+            raise ValueError(
+                "The lower bound must be less than or equal to the upper bound"
+            )
+        lo = max(lower_bound, 0)
+        hi = min(upper_bound, (1 << self.bits) - 1) + 1
+        # Split `[lo, hi)` into aligned blocks, from the finest level up.
+        blocks_by_level: list[list[int]] = [[] for _ in range(self.bits + 1)]
+        level = 0
+        while lo < hi:
+            if lo & 1:
+                blocks_by_level[level].append(lo)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                blocks_by_level[level].append(hi)
+            lo >>= 1
+            hi >>= 1
+            level += 1
+
+        count = 0
+        for level, offset in zip(self._exact.tolist(), self._exact_offsets.tolist()):
+            for block in blocks_by_level[level]:
+                count += int(self._exact_counts[offset + block])
+        for i, level in enumerate(self._sketched.tolist()):
+            for block in blocks_by_level[level]:
+                counters = (
+                    (self._a[i] * (block % _HASH_PRIME) + self._b[i])
+                    % (_HASH_PRIME)
+                    % self.width
+                )
+                count += int(self._sketch_counts[i, self._rows, counters].min())
+        return count
 
     def __len__(self) -> int:
         return self.total
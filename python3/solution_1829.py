@@ -3,8 +3,8 @@
 
 From 2sig.
 
-Ghost is a two-person word game where players alternate appending letters to a word. The first 
-person who spells out a word, or creates a prefix for which there is no possible continuation, 
+Ghost is a two-person word game where players alternate appending letters to a word. The first
+person who spells out a word, or creates a prefix for which there is no possible continuation,
 loses. Here is a sample game:
 
 Player 1: g
@@ -12,10 +12,10 @@ Player 2: h
 Player 1: o
 Player 2: s
 Player 1: t [loses]
-Given a dictionary of words, determine the letters the first player should start with, such that 
+Given a dictionary of words, determine the letters the first player should start with, such that
 with optimal play they cannot lose.
 
-For example, if the dictionary is `["cat", "calf", "dog", "bear"]`, the only winning start letter 
+For example, if the dictionary is `["cat", "calf", "dog", "bear"]`, the only winning start letter
 would be b.
 
 The prompt is not specific enough, so I decided to interpret this question so that the solution
@@ -43,7 +43,7 @@ which would be an expensive bottom-up traversal.
 After we build the trie, we can find the winning prefix sequences by traversing the trie
 and building up the prefixes as we go along. If we run into a node that's not poisoned, (i.e.
 none of the children of that node can lead to a losing word), we have found a minimal sequence
-of letters that will lead to a win. We can add this prefix to a set. 
+of letters that will lead to a win. We can add this prefix to a set.
 
 We also take care not to add the sequences from any terminal nodes, which are also full words.
 If a player plays every letter in a word, then they lose.
@@ -57,9 +57,18 @@ so that's the space complexity. We then traverse again to find the optimal winni
 This is also a linear traversal.
 """
 
-from collections.abc import Sequence
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import TypeVar
+from pathlib import Path
+from types import TracebackType
+from typing import Final, Self, TypeVar
 
 
 T = TypeVar("T")
@@ -85,6 +94,9 @@ class Node[T]:
     If the node is terminal, or sentinel node, this will be `None`
     """
 
+    word_end: bool = False
+    """Whether a word ends at this node."""
+
     @property
     def terminal(self) -> bool:
         return self.children is None or len(self.children) == 0
@@ -131,21 +143,520 @@ class Trie[T]:
             if elem not in curr.children:
                 curr.children[elem] = Node(elem, poisoned=poisoned)
             curr = curr.children[elem]
+        # The last node might already exist as a prefix of another word, so it needs the flag too.
+        curr.poisoned |= poisoned
+        curr.word_end = True
+
+    def remove(self, /, x: Sequence[T]) -> bool:
+        """
+        Remove an element from the trie.
+
+        Removing a word can only change the nodes on its path, so we walk back up the path,
+        deleting nodes that no longer lead to any word and recomputing the poisoned flag of the
+        rest from their children. That's $O(m)$ for a word of length $m$ (times the number of
+        children of each node on the path).
+
+        Returns:
+            Whether the element was in the trie.
+        """
+        if len(x) == 0:
+            return False
+        path = [self._root]
+        for elem in x:
+            children = path[-1].children
+            if children is None or elem not in children:
+                return False
+            path.append(children[elem])
+        if not path[-1].word_end:
+            return False
+        path[-1].word_end = False
+
+        for depth in range(len(x), 0, -1):
+            node = path[depth]
+            parent = path[depth - 1]
+            if node.terminal and not node.word_end:
+                assert parent.children is not None
+                del parent.children[node.value]
+                continue
+            # A node is poisoned if an odd length word ends there, or under any of its children.
+            node.poisoned = (node.word_end and depth % 2 == 1) or any(
+                child.poisoned for child in (node.children or {}).values()
+            )
+        self._root.poisoned = any(
+            child.poisoned for child in (self._root.children or {}).values()
+        )
+        return True
 
     @property
     def root(self) -> Node[T]:
         return self._root
 
 
-def optimal_start_letters(dictionary: list[str]) -> set[str]:
+def _frontier(node: Node[str], prefix: str) -> Iterator[str]:
+    """
+    Find the minimal winning prefixes in the subtree of `node`, assuming all of its ancestors are
+    poisoned.
+
+    This is an iterative DFS, so long words can't hit the recursion limit. Instead of building a
+    new prefix string at every level, which copies $O(m)$ characters per node, the DFS keeps the
+    letters of the current path in one shared buffer. Every node just overwrites its own position,
+    and we only join the buffer into a string for the prefixes we yield.
+
+    Args:
+        node: The root of the subtree.
+        prefix: The letters before `node`.
+    """
+    buffer = list(prefix)
+    stack = [(node, len(buffer))]
+    while stack:
+        node, depth = stack.pop()
+        # Playing a whole word loses.
+        if node.terminal:
+            continue
+        assert node.children is not None
+        del buffer[depth:]
+        buffer.append(node.value)
+        if node.poisoned:
+            stack.extend((child, depth + 1) for child in node.children.values())
+        else:
+            yield "".join(buffer)
+
+
+class GhostDictionary:
+    """
+    A dictionary of words that can change, which keeps its winning prefixes up to date.
+
+    A prefix is winning if it isn't poisoned and every shorter prefix is. Adding or removing a word
+    only changes the poisoned flags on its own path, so only two things can change:
+
+    * The first prefix of the word that isn't poisoned, which is the winning prefix on the path.
+    * The subtrees hanging off the path. A subtree's winning prefixes only count if every node
+      above it is poisoned, so if the poisoned part of the path got longer, the subtrees hanging
+      off the newly poisoned nodes gain their winning prefixes, and if it got shorter, they lose
+      them.
+
+    Both only depend on the word's path and the subtrees next to it, so an edit never has to
+    search the whole trie.
+    """
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        """
+        Args:
+            words: The initial words. Every word must have a length of at least 1.
+        """
+        self._trie: Trie[str] = Trie(sentinel="")
+        for word in words:
+            self._trie.insert(word)
+        self._winning: set[str] = set()
+        for child in (self._trie.root.children or {}).values():
+            self._winning.update(_frontier(child, ""))
+
+    @property
+    def trie(self) -> Trie[str]:
+        return self._trie
+
+    @property
+    def winning_prefixes(self) -> set[str]:
+        """The same prefixes as `optimal_start_letters` for the current words."""
+        return set(self._winning)
+
+    def _path(self, word: str) -> list[Node[str]]:
+        """The nodes for each non-empty prefix of `word` that's in the trie."""
+        path: list[Node[str]] = []
+        node = self._trie.root
+        for letter in word:
+            if node.children is None or letter not in node.children:
+                break
+            node = node.children[letter]
+            path.append(node)
+        return path
+
+    @staticmethod
+    def _poisoned_depth(path: list[Node[str]]) -> int:
+        """How many nodes at the start of the path are poisoned."""
+        depth = 0
+        while depth < len(path) and path[depth].poisoned:
+            depth += 1
+        return depth
+
+    def add(self, word: str) -> None:
+        """Add a word, which must have a length of at least 1."""
+        if len(word) == 0:
+            raise ValueError("Words must have a length of at least 1")
+        self._edit(word, self._trie.insert)
+
+    def remove(self, word: str) -> bool:
+        """
+        Remove a word.
+
+        Returns:
+            Whether the word was in the dictionary.
+        """
+        removed = False
+
+        def remove(word: str) -> None:
+            nonlocal removed
+            removed = self._trie.remove(word)
+
+        self._edit(word, remove)
+        return removed
+
+    def _edit(self, word: str, edit: Callable[[str], object]) -> None:
+        before = self._poisoned_depth(self._path(word))
+        winner = self._path_winner(word, before)
+        if winner is not None:
+            self._winning.discard(winner)
+
+        edit(word)
+
+        path = self._path(word)
+        after = self._poisoned_depth(path)
+        winner = self._path_winner(word, after)
+        if winner is not None:
+            self._winning.add(winner)
+
+        # The subtrees hanging off the nodes that were poisoned before or after, but not both.
+        for depth in range(min(before, after), min(max(before, after), len(path))):
+            node = path[depth]
+            prefix = word[: depth + 1]
+            for letter, child in (node.children or {}).items():
+                if depth + 1 < len(word) and letter == word[depth + 1]:
+                    continue
+                for prefix_ in _frontier(child, prefix):
+                    if after > before:
+                        self._winning.add(prefix_)
+                    else:
+                        self._winning.discard(prefix_)
+
+    def _path_winner(self, word: str, poisoned_depth: int) -> str | None:
+        """The winning prefix on the path of `word`, if there is one."""
+        path = self._path(word)
+        if poisoned_depth >= len(path) or path[poisoned_depth].terminal:
+            return None
+        return word[: poisoned_depth + 1]
+
+    def __contains__(self, word: str) -> bool:
+        path = self._path(word)
+        return len(path) == len(word) > 0 and path[-1].word_end
+
+
+TRIE_MAGIC: Final[bytes] = b"GHST"
+"""The first bytes of every saved `CompactTrie`."""
+
+TRIE_VERSION: Final[int] = 1
+"""The version of the file format."""
+
+_TRIE_HEADER: Final[struct.Struct] = struct.Struct("<4sIQ")
+"""Magic, version, number of nodes."""
+
+
+def _to_uint32_bytes(xs: Sequence[int]) -> bytes:
+    """Native (little-endian) uint32 bytes for `xs`, matching what `load` casts the file back to."""
+    if isinstance(xs, memoryview):
+        return xs.tobytes()
+    return array("I", xs).tobytes()
+
+
+def _get_bit(bits: bytearray | memoryview, i: int) -> bool:
+    return bits[i >> 3] >> (i & 7) & 1 == 1
+
+
+def _set_bit(bits: bytearray, i: int) -> None:
+    bits[i >> 3] |= 1 << (i & 7)
+
+
+class CompactTrie:
+    """
+    A read-only trie of words, stored in a few flat arrays instead of a `Node` object and a `dict`
+    per letter.
+
+    The nodes are numbered in preorder, with the root (the empty prefix) as node 0 and the children
+    of every node sorted by letter. In preorder, the first child of node `i` is node `i + 1`, and
+    every subtree is a contiguous range of nodes, so all we need to navigate is where each subtree
+    ends: the next sibling of node `i` is `subtree_end[i]`, and node `i` has children if
+    `subtree_end[i] > i + 1`. We also get to skip a whole subtree by jumping to its end.
+
+    Each node costs a 4 byte letter, a 4 byte subtree end and two bits (poisoned and whether a word
+    ends there), compared to a few hundred bytes for a `Node` and its `dict`.
+    """
+
+    def __init__(
+        self,
+        labels: Sequence[int],
+        subtree_end: Sequence[int],
+        poisoned: bytearray | memoryview,
+        word_end: bytearray | memoryview,
+    ) -> None:
+        """
+        Use `from_words` to build a trie, or `load` to map one that was saved. This takes the
+        arrays that describe one.
+
+        Args:
+            labels: The code point of the letter at each node. The root's is 0.
+            subtree_end: The node after the last node in each node's subtree.
+            poisoned: A bitset of the nodes that are a prefix of a word with an odd length.
+            word_end: A bitset of the nodes where a word ends.
+        """
+        self.labels = labels
+        self.subtree_end = subtree_end
+        self.poisoned = poisoned
+        self.word_end = word_end
+        self._mmap: mmap.mmap | None = None
+        self._views: list[memoryview] = []
+
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> Self:
+        """
+        Build the trie in a single pass over the sorted words.
+
+        Sorted words visit the trie in preorder, so each new node is appended to the arrays. We
+        keep the path to the previous word on a stack. A new word shares its first `k` letters
+        with the previous one, so the nodes on the stack below that are finished: their subtrees
+        end at the next node we append.
+        """
+        labels = array("I", [0])
+        subtree_end = array("I", [0])
+        poisoned = bytearray(1)
+        word_end = bytearray(1)
+        path = [0]
+        previous = ""
+        for word in sorted(set(words)):
+            if len(word) == 0:
+                continue
+            shared = 0
+            while (
+                shared < min(len(word), len(previous))
+                and word[shared] == previous[shared]
+            ):
+                shared += 1
+            while len(path) > shared + 1:
+                subtree_end[path.pop()] = len(labels)
+            for letter in word[shared:]:
+                path.append(len(labels))
+                labels.append(ord(letter))
+                subtree_end.append(0)
+                if len(labels) > 8 * len(poisoned):
+                    poisoned.append(0)
+                    word_end.append(0)
+            _set_bit(word_end, path[-1])
+            # If there is an odd number of letters then player 1 will lose
+            if len(word) % 2 == 1:
+                for node in path:
+                    _set_bit(poisoned, node)
+            previous = word
+        while path:
+            subtree_end[path.pop()] = len(labels)
+        return cls(labels, subtree_end, poisoned, word_end)
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        """Write the trie to `path` in a format that `load` can memory map."""
+        with open(path, "wb") as f:
+            f.write(_TRIE_HEADER.pack(TRIE_MAGIC, TRIE_VERSION, len(self)))
+            f.write(_to_uint32_bytes(self.labels))
+            f.write(_to_uint32_bytes(self.subtree_end))
+            f.write(self.poisoned)
+            f.write(self.word_end)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> Self:
+        """
+        Memory map a trie that was written by `save`.
+
+        This is $O(1)$ in the size of the dictionary: the arrays are used straight from the map,
+        so nothing is deserialized, and queries only read the pages of the file they touch.
+        """
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, n = _TRIE_HEADER.unpack_from(mm)
+            if magic != TRIE_MAGIC or version != TRIE_VERSION:
+                raise ValueError(f"{path} is not a version {TRIE_VERSION} trie")
+            if sys.byteorder != "little":
+                raise ValueError(
+                    "Saved tries can only be loaded on little-endian machines"
+                )
+            raw = memoryview(mm)
+        except BaseException:
+            mm.close()
+            raise
+
+        bitset_size = (n + 7) // 8
+        offset = _TRIE_HEADER.size
+        labels = raw[offset : offset + 4 * n].cast("I")
+        offset += 4 * n
+        subtree_end = raw[offset : offset + 4 * n].cast("I")
+        offset += 4 * n
+        poisoned = raw[offset : offset + bitset_size]
+        offset += bitset_size
+        word_end = raw[offset : offset + bitset_size]
+        trie = cls(labels, subtree_end, poisoned, word_end)
+        trie._mmap = mm
+        trie._views = [labels, subtree_end, poisoned, word_end, raw]
+        return trie
+
+    def close(self) -> None:
+        """Unmap the file backing a loaded trie. This does nothing for a trie in memory."""
+        if self._mmap is None:
+            return
+        for view in self._views:
+            view.release()
+        self._views = []
+        self._mmap.close()
+        self._mmap = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """The number of nodes, including the root."""
+        return len(self.labels)
+
+    def is_poisoned(self, node: int) -> bool:
+        return _get_bit(self.poisoned, node)
+
+    def is_word(self, node: int) -> bool:
+        return _get_bit(self.word_end, node)
+
+    def has_children(self, node: int) -> bool:
+        return self.subtree_end[node] > node + 1
+
+    def children(self, node: int) -> Iterator[int]:
+        """The children of `node`, in order of their letters."""
+        child = node + 1
+        end = self.subtree_end[node]
+        while child < end:
+            yield child
+            child = self.subtree_end[child]
+
+    def find(self, prefix: str) -> int | None:
+        """The node for `prefix`, or `None` if no word starts with it."""
+        node = 0
+        for letter in prefix:
+            code = ord(letter)
+            for child in self.children(node):
+                if self.labels[child] >= code:
+                    break
+            else:
+                return None
+            if self.labels[child] != code:
+                return None
+            node = child
+        return node
+
+    def winning_prefixes(self, start: int = 1, stop: int | None = None) -> set[str]:
+        """
+        Find the minimal prefixes that guarantee a win, exactly like `optimal_start_letters`.
+
+        This is a single scan over the nodes in preorder. A node that isn't poisoned is a winning
+        prefix, so we jump past its subtree, and we keep the path from the root to the current
+        node on a stack to spell out the prefixes.
+
+        Args:
+            start: The first node to scan. To only scan some first letters, this must be one of
+              the root's children.
+            stop: The node to stop before. Defaults to every node after `start`.
+        """
+        labels = self.labels
+        subtree_end = self.subtree_end
+        prefixes: set[str] = set()
+        path: list[int] = []
+        node = start
+        stop = len(labels) if stop is None else stop
+        while node < stop:
+            while path and subtree_end[path[-1]] <= node:
+                path.pop()
+            if not self.has_children(node):
+                # Playing the whole word loses.
+                node += 1
+            elif self.is_poisoned(node):
+                path.append(node)
+                node += 1
+            else:
+                prefixes.add(
+                    "".join(map(chr, (labels[i] for i in path))) + chr(labels[node])
+                )
+                node = subtree_end[node]
+        return prefixes
+
+
+def _winning_prefixes_in_file(
+    path: str | os.PathLike[str], start: int, stop: int
+) -> set[str]:
+    """Find the winning prefixes in one first-letter subtree of a saved `CompactTrie`."""
+    with CompactTrie.load(path) as trie:
+        return trie.winning_prefixes(start, stop)
+
+
+def parallel_winning_prefixes(
+    path: str | os.PathLike[str],
+    workers: int | None = None,
+    executor: Executor | None = None,
+) -> set[str]:
+    """
+    Find the winning prefixes of a saved `CompactTrie`, with each first-letter subtree evaluated in
+    a separate process.
+
+    The winning prefixes under different first letters don't depend on each other. Every worker
+    memory maps the same file, so they share one read-only copy of the trie through the page cache,
+    and nothing but the subtree bounds and the results has to be sent between processes.
+
+    Args:
+        path: A trie written by `CompactTrie.save`.
+        workers: The number of worker processes. Defaults to the number of CPUs. With a single
+          worker (or a single first letter) the search runs in this process.
+        executor: An existing executor to run the jobs in, so a pool can be reused across calls.
+          `workers` is ignored if this is set.
+
+    Returns:
+        The same prefixes as `optimal_start_letters`.
+    """
+    if workers is not None and workers <= 0:
+        raise ValueError("The number of workers must be positive")
+    with CompactTrie.load(path) as trie:
+        jobs = [(path, child, trie.subtree_end[child]) for child in trie.children(0)]
+    if executor is not None:
+        results = executor.map(_winning_prefixes_in_file, *zip(*jobs))
+    elif workers == 1 or len(jobs) <= 1:
+        results = (_winning_prefixes_in_file(*job) for job in jobs)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_winning_prefixes_in_file, *zip(*jobs)))
+    return set().union(*results)
+
+
+def optimal_start_letters(
+    dictionary: list[str], compact: bool = False, workers: int = 1
+) -> set[str]:
     """
     Args:
         dictionary: A list of words that define valid prefixes and losing words. Every string in this
           list must have a length of at least 1.
+        compact: Use a `CompactTrie`, which takes a fraction of the memory for large dictionaries.
+          The result is the same either way.
+        workers: The number of processes to evaluate the first-letter subtrees in. With more than
+          one, the dictionary is built into a `CompactTrie` and saved to a temporary file that the
+          workers share (see `parallel_winning_prefixes`). This must be positive.
 
     Returns:
         A list of starting sequences that will not lose with optimal playing.
     """
+    if workers <= 0:
+        raise ValueError("The number of workers must be positive")
+    if workers > 1:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "dictionary.trie"
+            CompactTrie.from_words(dictionary).save(path)
+            return parallel_winning_prefixes(path, workers)
+    if compact:
+        return CompactTrie.from_words(dictionary).winning_prefixes()
     trie = Trie(sentinel="")
     for word in dictionary:
         trie.insert(word)
@@ -154,24 +665,109 @@ def optimal_start_letters(dictionary: list[str]) -> set[str]:
     # first node that has no poisoned children. That is a minimal sequence
     # that's guaranteed to win.
     optimal_prefixes: set[str] = set()
+    for child in (trie.root.children or {}).values():
+        optimal_prefixes.update(_frontier(child, ""))
+    return optimal_prefixes
 
-    def dfs_helper(node: Node[str], prefix: str) -> None:
-        # If we have a terminal node, the sequence is the whole string.
-        # We can't play a whole string because that would cause the player to lose the game.
-        if node.terminal:
-            return
-        assert node.children is not None
 
-        new_prefix = prefix + node.value
+class GhostSolver:
+    """
+    Solves Ghost exactly for any number of players, instead of using the parity of word lengths.
+
+    A player loses by spelling out a word, or by playing a letter that no word continues with. So
+    from a prefix, the only safe moves are the children of its node in the trie that aren't words,
+    and a player without a safe move loses.
+
+    We solve every prefix with minimax in a single bottom-up pass over a `CompactTrie`. In
+    preorder every child comes after its parent, so visiting the nodes in reverse order solves all
+    of the children before their parent. The value of a prefix is which player loses, counted from
+    the player about to move: 0 means they lose, 1 means the next player does and so on. A move to
+    a child whose loser is `r` players after the next player makes the loser `r + 1` players after
+    this one. The player to move picks a move that doesn't make them the loser, if there is one.
+    With more than two players several moves can avoid losing, and then they pick the smallest
+    letter, so the solution is deterministic.
+
+    The loser and best move of every node are stored in two flat arrays indexed like the trie, which
+    serve as the transposition table. A query finds the prefix's node in $O(m)$, the same as hashing
+    it would cost, and reads the answer without searching again.
+    """
+
+    def __init__(self, dictionary: Iterable[str], players: int = 2) -> None:
+        """
+        Args:
+            dictionary: The words. Every word must have a length of at least 1.
+            players: The number of players. This must be between 2 and 255.
+        """
+        if not 2 <= players <= 255:
+            raise ValueError("The number of players must be between 2 and 255")
+        self.players = players
+        """The number of players."""
+
+        trie = CompactTrie.from_words(dictionary)
+        n = len(trie)
+        # Only prefixes that aren't words can be played from, the others have ended the game.
+        loser = array("B", bytes(n))
+        best = array("I", bytes(4 * n))
+        for node in range(n - 1, -1, -1):
+            if node != 0 and trie.is_word(node):
+                continue
+            fallback = 0
+            for child in trie.children(node):
+                if trie.is_word(child):
+                    continue
+                if fallback == 0:
+                    fallback = child
+                offset = (1 + loser[child]) % players
+                if offset != 0:
+                    loser[node] = offset
+                    best[node] = child
+                    break
+            else:
+                # Every move loses, so just play the first safe one (if any) and hope for a mistake.
+                best[node] = fallback
+
+        self._trie = trie
+        self._loser = loser
+        """The loser of every playable prefix, counted from the player to move, by node."""
+
+        self._best = best
+        """The child to move to from every playable prefix by node, or 0 if there isn't one."""
+
+    def loser(self, prefix: str = "") -> int:
+        """
+        Which player loses from `prefix` with optimal play.
 
-        if node.poisoned:
-            assert node.children is not None
-            for child in node.children.values():
-                dfs_helper(child, new_prefix)
-        else:
-            optimal_prefixes.add(new_prefix)
+        Players are numbered from 0 in order of play, so the player to move after `prefix` is
+        `len(prefix) % players`.
 
-    assert trie.root.children is not None
-    for child in trie.root.children.values():
-        dfs_helper(child, "")
-    return optimal_prefixes
+        Args:
+            prefix: Letters played so far. This must be a prefix of a word, and not a whole word.
+        """
+        return (len(prefix) + self._loser[self._lookup(prefix)]) % self.players
+
+    def best_move(self, prefix: str = "") -> str | None:
+        """
+        The letter the player to move after `prefix` should play.
+
+        Returns:
+            A letter that doesn't make the player to move lose, if there is one. Otherwise a safe
+            letter that loses later, or `None` if every letter loses immediately.
+        """
+        best = self._best[self._lookup(prefix)]
+        return chr(self._trie.labels[best]) if best != 0 else None
+
+    def _lookup(self, prefix: str) -> int:
+        """The node for `prefix`, which is $O(m)$ like hashing it would be."""
+        node = self._trie.find(prefix)
+        if node is None or (node != 0 and self._trie.is_word(node)):
+            raise ValueError(f"{prefix!r} is not a playable prefix")
+        return node
+
+    def winning_start_letters(self) -> set[str]:
+        """The first letters that the first player can start with and not lose."""
+        trie = self._trie
+        return {
+            chr(trie.labels[child])
+            for child in trie.children(0)
+            if not trie.is_word(child) and (1 + self._loser[child]) % self.players != 0
+        }
@@ -0,0 +1,88 @@
+"""
+Picks a substring search algorithm based on the needle.
+
+Every backend has the same signature and semantics as `kmp.kmp_substr`.
+
+* KMP (`kmp.py`) looks at every haystack character exactly once, which is hard to beat for very
+  short needles since there's nothing to skip.
+* Boyer-Moore-Horspool (`horspool.py`) skips up to a whole needle length per step when the
+  haystack character isn't in the needle, so it's the fastest on average for long needles over
+  large alphabets. On small alphabets the skips are short and its $O(nm)$ worst case shows up.
+* Two-way (`two_way.py`) is linear in the worst case with constant extra space, and still makes
+  long shifts, so it's the safe choice for long needles over small alphabets like DNA.
+
+Rabin-Karp (`rabin_karp.py`) is also available as a backend, mostly so it gets cross-checked
+against the others. It's never selected automatically because its strength is searching for many
+needles at once, which `RabinKarp` does directly.
+"""
+
+from collections.abc import Callable
+from typing import Final
+
+from horspool import horspool_substr
+from kmp import Text, kmp_substr
+from rabin_karp import rabin_karp_substr
+from two_way import two_way_substr
+
+BACKENDS: Final[dict[str, Callable[[Text, Text], int]]] = {
+    "kmp": kmp_substr,
+    "horspool": horspool_substr,
+    "two_way": two_way_substr,
+    "rabin_karp": rabin_karp_substr,
+}
+"""Every substring search backend by name."""
+
+SHORT_NEEDLE_SIZE: Final[int] = 3
+"""Needles this short or shorter don't benefit from skipping."""
+
+SMALL_ALPHABET_SIZE: Final[int] = 4
+"""Alphabets this small or smaller make Horspool's shifts too short to be worth it."""
+
+
+def select_backend(needle: Text, alphabet_size: int | None = None) -> str:
+    """
+    Choose the substring search backend that should be fastest for `needle`.
+
+    Args:
+        needle: The substring that will be searched for.
+        alphabet_size: The number of distinct characters in the haystack, if it's known. Otherwise
+          we use the number of distinct characters in the needle as an estimate.
+
+    Returns:
+        A key in `BACKENDS`.
+    """
+    if len(needle) <= SHORT_NEEDLE_SIZE:
+        return "kmp"
+    if alphabet_size is None:
+        alphabet_size = len(set(needle))
+    if alphabet_size <= SMALL_ALPHABET_SIZE:
+        return "two_way"
+    return "horspool"
+
+
+def substr(
+    needle: Text,
+    haystack: Text,
+    backend: str | None = None,
+    alphabet_size: int | None = None,
+) -> int:
+    """
+    Find the starting index where `needle` is in `haystack` with the best backend for the needle.
+
+    Args:
+        needle: The substring to search for within `haystack`. This must not be an empty string.
+        haystack: The string to search. This must not be an empty string.
+        backend: Force a specific key in `BACKENDS` instead of choosing one automatically.
+        alphabet_size: Passed on to `select_backend`.
+
+    Returns:
+        The start index of where `needle` is in `haystack`. If the substring is not found,
+        this will return `-1`.
+    """
+    if backend is None:
+        backend = select_backend(needle, alphabet_size)
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown backend {backend!r}, expected one of {list(BACKENDS)}"
+        )
+    return BACKENDS[backend](needle, haystack)
@@ -0,0 +1,273 @@
+"""
+A suffix array index for answering many substring queries against a fixed haystack.
+
+KMP has to scan the whole haystack for every query. If the haystack doesn't change, we can instead
+sort all of its suffixes once. Every occurrence of a needle is the start of a suffix that begins
+with the needle, and those suffixes are next to each other in sorted order, so a binary search
+finds all of them in $O(m \\log n)$ comparisons of at most $m$ characters.
+
+We also build the LCP array, where `lcp[i]` is the length of the longest common prefix of the
+suffixes at `sa[i - 1]` and `sa[i]`. Once the binary search finds the first suffix that starts with
+the needle, the rest of the matches are the following suffixes with an LCP of at least $m$, so we
+don't need a second binary search for the end of the range.
+
+The index can be saved to a file and memory mapped back, so a large index can be queried without
+reading it into memory first.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Buffer, Sequence
+from types import TracebackType
+from typing import Final, Self
+
+MAGIC: Final[bytes] = b"SAIX"
+"""The first bytes of every saved index."""
+
+VERSION: Final[int] = 1
+"""The version of the file format."""
+
+_HEADER: Final[struct.Struct] = struct.Struct("<4sIB7xQ")
+"""Magic, version, whether the text is a `str`, padding so the arrays are aligned, text length."""
+
+_STR_ENCODING: Final[str] = "utf-32-le"
+"""Strings are saved with a fixed-width encoding so a character offset maps to a byte offset."""
+
+
+def build_suffix_array(text: str | bytes) -> array[int]:
+    """
+    Sort the suffixes of `text` with prefix doubling.
+
+    After round $k$ every suffix is ranked by its first $2^k$ characters. We can rank suffixes by
+    their first $2^{k+1}$ characters by sorting on pairs of existing ranks, so we need at most
+    $\\log n$ rounds of sorting, which is $O(n \\log^2 n)$ overall.
+
+    Returns:
+        The start index of every suffix of `text`, in lexicographic order of the suffixes.
+    """
+    n = len(text)
+    if n == 0:
+        return array("q")
+    rank = [ord(c) for c in text] if isinstance(text, str) else list(text)
+    sa = list(range(n))
+    k = 1
+    while True:
+        # Suffixes shorter than `k` sort before any suffix that continues, hence the -1.
+        keys = [(rank[i], rank[i + k] if i + k < n else -1) for i in range(n)]
+        sa.sort(key=keys.__getitem__)
+        new_rank = [0] * n
+        for j in range(1, n):
+            new_rank[sa[j]] = new_rank[sa[j - 1]] + (keys[sa[j]] != keys[sa[j - 1]])
+        rank = new_rank
+        # Every suffix has a distinct rank, so the order can't change anymore.
+        if rank[sa[-1]] == n - 1:
+            break
+        k *= 2
+    return array("q", sa)
+
+
+def build_lcp_array(text: str | bytes, sa: Sequence[int]) -> array[int]:
+    """
+    Build the LCP array with Kasai's algorithm in $O(n)$.
+
+    The trick is that if the suffix at `i` shares `h` characters with its predecessor in sorted
+    order, the suffix at `i + 1` shares at least `h - 1` with its own predecessor, so we never have
+    to compare more than $2n$ characters in total.
+
+    Returns:
+        An array where `lcp[i]` is the length of the longest common prefix of the suffixes at
+        `sa[i - 1]` and `sa[i]`, and `lcp[0]` is 0.
+    """
+    n = len(text)
+    lcp = array("q", bytes(8 * n))
+    rank = [0] * n
+    for i, start in enumerate(sa):
+        rank[start] = i
+    h = 0
+    for i in range(n):
+        if rank[i] == 0:
+            h = 0
+            continue
+        prev = sa[rank[i] - 1]
+        while i + h < n and prev + h < n and text[i + h] == text[prev + h]:
+            h += 1
+        lcp[rank[i]] = h
+        if h > 0:
+            h -= 1
+    return lcp
+
+
+class SuffixArrayIndex:
+    """
+    A fixed haystack and its suffix and LCP arrays.
+
+    Build one from a haystack in memory, or `load` one that was `save`d earlier. Loaded indexes are
+    memory mapped, so they should be closed (or used as a context manager) when you're done.
+    """
+
+    def __init__(self, haystack: str | Buffer) -> None:
+        """
+        Args:
+            haystack: The text to index. Either a `str`, or a bytes-like object which will be
+              searched as bytes.
+        """
+        text = haystack if isinstance(haystack, str) else bytes(haystack)
+        self._text: str | bytes | memoryview = text
+        self._is_str = isinstance(text, str)
+        self._n = len(text)
+        self._sa: Sequence[int] = build_suffix_array(text)
+        self._lcp: Sequence[int] = build_lcp_array(text, self._sa)
+        self._mmap: mmap.mmap | None = None
+        self._views: list[memoryview] = []
+
+    @property
+    def suffix_array(self) -> Sequence[int]:
+        """The start index of every suffix of the haystack, in sorted order."""
+        return self._sa
+
+    @property
+    def lcp(self) -> Sequence[int]:
+        """The longest common prefix of each suffix in `suffix_array` with the one before it."""
+        return self._lcp
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _slice(self, start: int, stop: int) -> str | bytes:
+        """The haystack between `start` and `stop`, wherever the haystack is stored."""
+        stop = min(stop, self._n)
+        if isinstance(self._text, memoryview):
+            if self._is_str:
+                return self._text[4 * start : 4 * stop].tobytes().decode(_STR_ENCODING)
+            return self._text[start:stop].tobytes()
+        return self._text[start:stop]
+
+    def find_all(self, needle: str | Buffer) -> list[int]:
+        """
+        Find every occurrence of `needle` in the haystack.
+
+        This is $O(m \\log n + z)$ for $z$ matches, plus sorting the matches by offset.
+
+        Args:
+            needle: The substring to search for. This must not be empty, and must be a `str` if
+              the haystack is a `str` (and bytes-like otherwise).
+
+        Returns:
+            The start index of each (possibly overlapping) match, in ascending order. These are the
+            same offsets as `kmp.kmp_findall(needle, haystack)`.
+        """
+        if isinstance(needle, str) != self._is_str:
+            raise TypeError(
+                "The needle and haystack must both be str or both be bytes-like"
+            )
+        if not isinstance(needle, str):
+            needle = bytes(needle)
+        if len(needle) == 0:
+            raise ValueError("The needle must not be an empty string")
+
+        m = len(needle)
+        sa = self._sa
+
+        # Find the first suffix whose first `m` characters are >= the needle.
+        lo = 0
+        hi = self._n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._slice(sa[mid], sa[mid] + m) < needle:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self._n or self._slice(sa[lo], sa[lo] + m) != needle:
+            return []
+
+        # Every following suffix that shares at least `m` characters with this one is a match.
+        end = lo + 1
+        while end < self._n and self._lcp[end] >= m:
+            end += 1
+        return sorted(sa[lo:end])
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        """Write the index to `path` in a format that `load` can memory map."""
+        if isinstance(self._text, memoryview):
+            text = self._text.tobytes()
+        elif isinstance(self._text, str):
+            text = self._text.encode(_STR_ENCODING)
+        else:
+            text = self._text
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, self._is_str, self._n))
+            f.write(_to_int64_bytes(self._sa))
+            f.write(_to_int64_bytes(self._lcp))
+            f.write(text)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> Self:
+        """
+        Memory map an index that was written by `save`.
+
+        Nothing is copied into memory up front. Queries only touch the pages of the file that the
+        binary search visits.
+        """
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, is_str, n = _HEADER.unpack_from(mm)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(
+                    f"{path} is not a version {VERSION} suffix array index"
+                )
+            if sys.byteorder != "little":
+                raise ValueError(
+                    "Saved indexes can only be loaded on little-endian machines"
+                )
+            raw = memoryview(mm)
+        except BaseException:
+            mm.close()
+            raise
+
+        index = cls.__new__(cls)
+        offset = _HEADER.size
+        sa = raw[offset : offset + 8 * n].cast("q")
+        offset += 8 * n
+        lcp = raw[offset : offset + 8 * n].cast("q")
+        offset += 8 * n
+        text = raw[offset:]
+        index._text = text
+        index._is_str = bool(is_str)
+        index._n = n
+        index._sa = sa
+        index._lcp = lcp
+        index._mmap = mm
+        index._views = [sa, lcp, text, raw]
+        return index
+
+    def close(self) -> None:
+        """Unmap the file backing a loaded index. This does nothing for an in-memory index."""
+        if self._mmap is None:
+            return
+        for view in self._views:
+            view.release()
+        self._views = []
+        self._mmap.close()
+        self._mmap = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def _to_int64_bytes(xs: Sequence[int]) -> bytes:
+    """Native (little-endian) int64 bytes for `xs`, matching what `load` casts the file back to."""
+    if isinstance(xs, memoryview):
+        return xs.tobytes()
+    return array("q", xs).tobytes()
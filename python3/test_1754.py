@@ -1,8 +1,34 @@
+from itertools import product
 from typing import Any
 
+import numpy as np
 import pytest
+from hypothesis import given
+from hypothesis.strategies import integers
+
+from solution_1754 import (
+    FLIPPED_CHARS,
+    all_strobo_nums,
+    combinations_with_replacement,
+    count_strobo,
+    count_strobo_in_range,
+    iter_strobo_nums,
+    nth_strobo,
+    strobo_nums_array,
+)
+
+
+def _brute_force(n_digits: int) -> list[int]:
+    """Every strobo number with `n_digits` digits, built from every possible first half."""
+    numbers = []
+    for first_half in product(FLIPPED_CHARS, repeat=(n_digits + 1) // 2):
+        second_half = [FLIPPED_CHARS[d] for d in reversed(first_half[: n_digits // 2])]
+        numbers.append(int("".join(map(str, [*first_half, *second_half]))))
+    return sorted(numbers)
 
-from solution_1754 import all_strobo_nums, combinations_with_replacement
+
+def _to_int(digits: list[int]) -> int:
+    return int("".join(map(str, digits)))
 
 
 @pytest.mark.parametrize(
@@ -41,6 +67,34 @@ def test_combinations_with_replacement(
     assert actual == set(expected)
 
 
+@pytest.mark.parametrize("xs", [[], ["a"], [3, 1, 2], list(range(10))])
+@pytest.mark.parametrize("size", [0, 1, 3])
+def test_combinations_with_replacement_is_a_product(xs: list[Any], size: int) -> None:
+    expected = list(product(xs, repeat=size))
+    assert list(combinations_with_replacement(xs, size)) == expected
+    # Every slice picks up exactly where the previous one stopped
+    chunks = [
+        list(combinations_with_replacement(xs, size, start, start + 7))
+        for start in range(0, len(expected), 7)
+    ]
+    assert [x for chunk in chunks for x in chunk] == expected
+
+
+def test_combinations_with_replacement_reuse_buffer() -> None:
+    combos = combinations_with_replacement("abc", 4, start=5, reuse_buffer=True)
+    first = next(combos)
+    assert first == ["a", "a", "b", "c"]
+    second = next(combos)
+    assert second is first
+    assert second == ["a", "a", "c", "a"]
+    assert sum(1 for _ in combos) == 3**4 - 7
+    assert list(combinations_with_replacement("ab", 2, start=10)) == []
+    with pytest.raises(ValueError):
+        next(combinations_with_replacement("ab", 2, start=-1))
+    with pytest.raises(ValueError):
+        next(combinations_with_replacement("ab", -1))
+
+
 @pytest.mark.parametrize(
     ("n", "expected"),
     [
@@ -66,3 +120,71 @@ def test_another_way(n: int, expected: list[tuple[int]]) -> None:
     actual = set([tuple(x) for x in all_strobo_nums(n)])
     expected_ = set(expected)
     assert actual == expected_
+
+
+@pytest.mark.parametrize("n", range(1, 8))
+def test_iter_strobo_nums(n: int) -> None:
+    numbers = [_to_int(digits) for digits in iter_strobo_nums(n)]
+    assert numbers == _brute_force(n)
+    assert [_to_int(digits) for digits in all_strobo_nums(n)] == numbers
+
+
+@given(integers(1, 6), integers(0, 10**6), integers(0, 10**6))
+def test_iter_strobo_nums_in_range(n: int, a: int, b: int) -> None:
+    lo, hi = min(a, b), max(a, b)
+    actual = [_to_int(digits) for digits in iter_strobo_nums(n, lo, hi)]
+    assert actual == [x for x in _brute_force(n) if lo <= x <= hi]
+
+
+def test_iter_strobo_nums_is_lazy() -> None:
+    # There are 4 ** 50 of these, so they can't be materialized
+    numbers = iter_strobo_nums(100, lo=9 * 10**99)
+    assert _to_int(next(numbers)) == int("9" + "1" * 98 + "6")
+    assert list(iter_strobo_nums(0)) == [[]]
+    with pytest.raises(ValueError):
+        next(iter_strobo_nums(-1))
+
+
+@pytest.mark.parametrize("n", range(0, 8))
+def test_count_strobo(n: int) -> None:
+    assert count_strobo(n) == len(all_strobo_nums(n))
+    for k, digits in enumerate(all_strobo_nums(n)):
+        assert nth_strobo(n, k) == digits
+
+
+@given(integers(-10, 10**7), integers(-10, 10**7))
+def test_count_strobo_in_range(a: int, b: int) -> None:
+    lo, hi = min(a, b), max(a, b)
+    expected = sum(lo <= x <= hi for n in range(1, 8) for x in _brute_force(n))
+    assert count_strobo_in_range(lo, hi) == expected
+
+
+def test_strobo_counting_bad_inputs() -> None:
+    assert count_strobo(100) == 4**50
+    assert _to_int(nth_strobo(100, 4**50 - 1)) == int("9" * 50 + "6" * 50)
+    with pytest.raises(ValueError):
+        count_strobo(-1)
+    with pytest.raises(ValueError):
+        nth_strobo(2, 16)
+    with pytest.raises(ValueError):
+        nth_strobo(2, -1)
+    with pytest.raises(ValueError):
+        count_strobo_in_range(5, 4)
+
+
+@pytest.mark.parametrize("n", range(1, 9))
+def test_strobo_nums_array(n: int) -> None:
+    numbers = strobo_nums_array(n)
+    assert numbers.dtype == np.int64
+    assert numbers.tolist() == [_to_int(digits) for digits in all_strobo_nums(n)]
+
+
+def test_strobo_nums_array_big() -> None:
+    # These don't fit in an int64 anymore
+    numbers = strobo_nums_array(19)
+    assert numbers.dtype == object
+    assert len(numbers) == count_strobo(19)
+    for k in [0, 1, 12345, len(numbers) - 1]:
+        assert numbers[k] == _to_int(nth_strobo(19, k))
+    with pytest.raises(ValueError):
+        strobo_nums_array(0)
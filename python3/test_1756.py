@@ -1,6 +1,26 @@
+import asyncio
+import threading
+from array import array
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
 import pytest
+from hypothesis import HealthCheck, given, settings
+from hypothesis.strategies import integers, lists
 
-from solution_1756 import HitCounter
+from solution_1756 import (
+    ApproximateHitCounter,
+    AsyncHitCounter,
+    BTree,
+    BucketedHitCounter,
+    ConcurrentHitCounter,
+    HitCounter,
+    Node,
+    WindowedHitCounter,
+)
 
 
 def test_hit_counter() -> None:
@@ -43,3 +63,368 @@ def test_record_negative() -> None:
 
     with pytest.raises(ValueError):
         hc.record(-100)
+
+
+def _check_tree(node: Node | None) -> tuple[int, int]:
+    """Checks the AVL and count invariants, returning the height and number of hits."""
+    if node is None:
+        return 0, 0
+    left_height, left_count = _check_tree(node.left)
+    right_height, right_count = _check_tree(node.right)
+    assert abs(left_height - right_height) <= 1
+    assert node.height == 1 + max(left_height, right_height)
+    assert node.descendant_count == left_count + right_count
+    if node.left is not None:
+        assert node.left.timestamp < node.timestamp
+    if node.right is not None:
+        assert node.right.timestamp > node.timestamp
+    return node.height, node.subtree_count
+
+
+@given(lists(integers(min_value=0, max_value=50)), integers(0, 50), integers(0, 50))
+def test_hit_counter_fuzzed(timestamps: list[int], a: int, b: int) -> None:
+    hc = HitCounter()
+    for ts in timestamps:
+        hc.record(ts)
+    _check_tree(hc._tree.root)
+    lower, upper = min(a, b), max(a, b)
+    assert hc.total == len(timestamps)
+    assert hc.recorded_timestamps == sorted(timestamps)
+    assert hc.range(lower, upper) == sum(lower <= ts <= upper for ts in timestamps)
+
+
+def test_tree_stays_balanced() -> None:
+    tree = BTree()
+    # Sorted insertion is the worst case for an unbalanced tree
+    for ts in range(1024):
+        tree.insert(ts)
+    height, count = _check_tree(tree.root)
+    assert count == tree.total == 1024
+    assert height <= 11
+    assert list(tree) == [(ts, 1) for ts in range(1024)]
+    assert tree.count_before(512, inclusive=False) == 512
+    assert tree.count_before(512, inclusive=True) == 513
+
+
+@given(
+    lists(integers(min_value=0, max_value=200), max_size=60),
+    integers(-10, 210),
+    integers(-10, 210),
+)
+@settings(suppress_health_check=[HealthCheck.function_scoped_fixture])
+def test_bucketed_hit_counter_fuzzed(
+    tmp_path_factory: pytest.TempPathFactory, timestamps: list[int], a: int, b: int
+) -> None:
+    directory = tmp_path_factory.mktemp("segments")
+    hc = BucketedHitCounter(directory, bucket_width=16, max_resident_hits=4)
+    for ts in timestamps:
+        hc.record(ts)
+        assert hc.resident_hits <= 4
+    lower, upper = min(a, b), max(a, b)
+    expected = sum(lower <= ts <= upper for ts in timestamps)
+    assert len(hc) == len(timestamps)
+    assert hc.range(lower, upper) == expected
+
+    # Everything that was flushed is picked up again from the segment headers
+    hc.flush()
+    reopened = BucketedHitCounter(directory, bucket_width=16)
+    assert reopened.total == len(timestamps)
+    assert reopened.range(lower, upper) == expected
+
+
+def test_bucketed_hit_counter(tmp_path: Path) -> None:
+    hc = BucketedHitCounter(tmp_path, bucket_width=10, max_resident_hits=2)
+    for ts in [5, 15, 1, 25, 12, 13]:
+        hc.record(ts)
+    assert hc.resident_hits <= 2
+    assert len(list(tmp_path.glob("*.seg"))) > 0
+    assert hc.range(0, 29) == 6
+    assert hc.range(10, 19) == 3
+    assert hc.range(2, 24) == 4
+    assert hc.range(13, 13) == 1
+    assert hc.range(30, 100) == 0
+
+
+def test_bucketed_hit_counter_reopen(tmp_path: Path) -> None:
+    with BucketedHitCounter(tmp_path, bucket_width=10) as hc:
+        for ts in range(100):
+            hc.record(ts)
+        # Nothing has to be flushed yet
+        assert hc.resident_hits == 100
+    assert hc.resident_hits == 0
+
+    reopened = BucketedHitCounter(tmp_path, bucket_width=10)
+    assert reopened.total == 100
+    assert reopened.range(0, 9) == 10
+    assert reopened.range(15, 34) == 20
+
+    # The bucket indices in the segments only make sense with the width they were written with
+    with pytest.raises(ValueError):
+        _ = BucketedHitCounter(tmp_path, bucket_width=3)
+
+    (tmp_path / "bad.seg").write_bytes(b"HITS")
+    with pytest.raises(ValueError):
+        _ = BucketedHitCounter(tmp_path, bucket_width=10)
+
+
+def test_bucketed_hit_counter_bad_inputs(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        _ = BucketedHitCounter(tmp_path, bucket_width=0)
+    with pytest.raises(ValueError):
+        _ = BucketedHitCounter(tmp_path, bucket_width=10, max_resident_hits=0)
+    hc = BucketedHitCounter(tmp_path, bucket_width=10)
+    with pytest.raises(ValueError):
+        hc.record(-1)
+    with pytest.raises(ValueError):
+        _ = hc.range(2, 1)
+
+
+@pytest.mark.parametrize("existing", [[], [3, 1, 4], list(range(0, 1000, 7))])
+@pytest.mark.parametrize(
+    "make_batch",
+    [
+        list,
+        lambda xs: (x for x in xs),
+        lambda xs: array("q", xs),
+        lambda xs: np.array(xs, dtype=np.int64),
+        lambda xs: np.array(xs, dtype=np.uint32)[::-1],
+    ],
+)
+@pytest.mark.parametrize("batch", [[], [5], [9, 2, 6, 5, 3, 5, 3, 5, 0, 999]])
+def test_record_many(
+    existing: list[int], make_batch: Callable[[list[int]], Any], batch: list[int]
+) -> None:
+    hc = HitCounter()
+    for ts in existing:
+        hc.record(ts)
+    hc.record_many(make_batch(batch))
+    _check_tree(hc._tree.root)
+    assert hc.recorded_timestamps == sorted(existing + batch)
+    assert hc.total == len(existing) + len(batch)
+    assert hc.range(3, 5) == sum(3 <= ts <= 5 for ts in existing + batch)
+
+    # Recording more afterwards still works
+    hc.record(4)
+    assert hc.recorded_timestamps == sorted([*existing, *batch, 4])
+
+
+def test_record_many_bad_inputs() -> None:
+    hc = HitCounter()
+    hc.record(1)
+    with pytest.raises(ValueError):
+        hc.record_many([5, 6, -1])
+    with pytest.raises(ValueError):
+        hc.record_many(array("q", [5, -1]))
+    with pytest.raises(TypeError):
+        hc.record_many(array("d", [1.5]))
+    # Nothing from the bad batches was recorded
+    assert hc.recorded_timestamps == [1]
+
+
+@given(
+    lists(integers(min_value=0, max_value=300), max_size=80),
+    integers(1, 40),
+    integers(1, 40),
+    integers(0, 20),
+)
+def test_windowed_hit_counter_fuzzed(
+    timestamps: list[int], horizon: int, window: int, ahead: int
+) -> None:
+    # Mostly in order, but some hits arrive late, like real traffic.
+    window = min(window, horizon)
+    hc = WindowedHitCounter(horizon)
+    for i, ts in enumerate(timestamps):
+        hc.record(ts)
+        now = max(timestamps[: i + 1]) + ahead
+        expected = sum(now - window < t <= now for t in timestamps[: i + 1])
+        assert hc.count_last(window, now) == expected
+    assert hc.total + hc.expired_hits == len(timestamps)
+    assert len(hc._buckets) == horizon + 1
+
+
+def test_windowed_hit_counter() -> None:
+    hc = WindowedHitCounter(horizon=300, resolution=60)
+    assert hc.count_last(60) == 0
+    for ts in [0, 30, 60, 90, 120, 300, 310]:
+        hc.record(ts)
+    assert hc.count_last(60) == 2
+    assert hc.count_last(300) == 5
+    assert hc.count_last(300, now=359) == 5
+    assert hc.count_last(60, now=1000) == 0
+
+    # Anything older than the horizon is gone for good
+    hc.record(1000)
+    hc.record(600)
+    assert hc.expired_hits == 1
+    assert hc.total == 8
+    assert hc.count_last(300) == 1
+    with pytest.raises(ValueError):
+        hc.count_last(60, now=400)
+
+
+def test_windowed_hit_counter_bad_inputs() -> None:
+    with pytest.raises(ValueError):
+        _ = WindowedHitCounter(horizon=0)
+    with pytest.raises(ValueError):
+        _ = WindowedHitCounter(horizon=10, resolution=0)
+    hc = WindowedHitCounter(horizon=10)
+    with pytest.raises(ValueError):
+        hc.record(-1)
+    with pytest.raises(ValueError):
+        hc.count_last(11)
+    with pytest.raises(ValueError):
+        hc.count_last(0)
+
+
+def test_concurrent_hit_counter() -> None:
+    hc = ConcurrentHitCounter(max_buffered=64)
+
+    def worker(offset: int) -> None:
+        for ts in range(offset, 10_000, 8):
+            hc.record(ts)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(worker, range(8)))
+    assert hc.total == 10_000
+    assert hc.range(100, 199) == 100
+    assert hc._counter.recorded_timestamps == list(range(10_000))
+
+
+def test_concurrent_hit_counter_queries_see_completed_records() -> None:
+    hc = ConcurrentHitCounter()
+    recorded = threading.Event()
+    stop = threading.Event()
+
+    def worker() -> None:
+        hc.record(5)
+        recorded.set()
+        # Keep the thread (and its buffer) alive while we query from another thread.
+        stop.wait()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    try:
+        recorded.wait()
+        assert hc.range(0, 10) == 1
+        assert len(hc) == 1
+    finally:
+        stop.set()
+        thread.join()
+
+    with pytest.raises(ValueError):
+        hc.record(-1)
+    with pytest.raises(ValueError):
+        _ = ConcurrentHitCounter(max_buffered=0)
+
+
+def test_concurrent_hit_counter_forgets_exited_threads() -> None:
+    hc = ConcurrentHitCounter()
+    for ts in range(50):
+        thread = threading.Thread(target=hc.record, args=(ts,))
+        thread.start()
+        thread.join()
+    hc.record(50)
+    assert hc.total == 51
+    # Only this thread is still alive
+    assert len(hc._buffers) == 1
+    assert hc.range(0, 9) == 10
+
+
+def test_concurrent_hit_counter_keeps_hits_of_threads_exiting_mid_query() -> None:
+    hc = ConcurrentHitCounter()
+    recorded, resume = threading.Event(), threading.Event()
+
+    def worker() -> None:
+        hc.record(1)
+        recorded.set()
+        resume.wait()
+        hc.record(2)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    recorded.wait()
+    drain = hc._drain
+
+    def drain_then_exit(buffer: list[int]) -> None:
+        # The worker appends right after its buffer was drained and exits before the query ends.
+        drain(buffer)
+        if thread.is_alive():
+            resume.set()
+            thread.join()
+
+    hc._drain = drain_then_exit  # type: ignore[method-assign]
+    assert hc.total == 1
+    del hc._drain
+    assert hc.total == 2
+    assert not hc._buffers
+
+
+def test_async_hit_counter() -> None:
+    async def main() -> tuple[int, int]:
+        hc = AsyncHitCounter()
+        await asyncio.gather(*(hc.record(ts) for ts in range(100)))
+        return await hc.total(), await hc.range(10, 19)
+
+    assert asyncio.run(main()) == (100, 10)
+
+
+@given(
+    lists(integers(min_value=0, max_value=(1 << 16) - 1), min_size=1, max_size=300),
+    integers(0, 1 << 16),
+    integers(0, 1 << 16),
+)
+def test_approximate_hit_counter_error_bound(
+    timestamps: list[int], a: int, b: int
+) -> None:
+    hc = ApproximateHitCounter(epsilon=0.05, delta=1e-6, bits=16, seed=1756)
+    memory = hc.memory_bytes
+    hc.record_many(timestamps)
+    assert hc.memory_bytes == memory
+    assert hc.total == len(hc) == len(timestamps)
+    lower, upper = min(a, b), max(a, b)
+    expected = sum(lower <= ts <= upper for ts in timestamps)
+    estimate = hc.range(lower, upper)
+    assert expected <= estimate <= expected + hc.epsilon * hc.total
+
+
+def test_approximate_hit_counter_skewed_traffic() -> None:
+    # Lots of hits on a few hot timestamps is what makes collisions hurt.
+    rng = np.random.default_rng(1756)
+    timestamps = (1_700_000_000 + rng.zipf(1.5, size=50_000) % 86_400).astype(np.int64)
+    hc = ApproximateHitCounter(epsilon=0.01, delta=0.01, seed=1756)
+    hc.record_many(timestamps)
+    hc.record(int(timestamps[0]))
+    timestamps = np.append(timestamps, timestamps[0])
+    for lower in range(1_700_000_000, 1_700_086_400, 3_600):
+        for upper in [lower, lower + 59, lower + 7_200]:
+            expected = int(((lower <= timestamps) & (timestamps <= upper)).sum())
+            estimate = hc.range(lower, upper)
+            assert expected <= estimate <= expected + hc.epsilon * hc.total
+
+
+def test_approximate_hit_counter_is_exact_when_small() -> None:
+    # With few enough possible timestamps, every level is counted exactly.
+    hc = ApproximateHitCounter(bits=8)
+    exact = HitCounter()
+    for ts in [5, 200, 5, 17, 255, 0]:
+        hc.record(ts)
+        exact.record(ts)
+    for lower in range(0, 256, 5):
+        for upper in range(lower, 300, 7):
+            assert hc.range(lower, upper) == exact.range(lower, upper)
+
+
+def test_approximate_hit_counter_bad_inputs() -> None:
+    for kwargs in [{"epsilon": 0}, {"delta": 1}, {"bits": 0}, {"bits": 63}]:
+        with pytest.raises(ValueError):
+            _ = ApproximateHitCounter(**kwargs)
+    hc = ApproximateHitCounter(bits=8)
+    with pytest.raises(ValueError):
+        hc.record(-1)
+    with pytest.raises(ValueError):
+        hc.record(256)
+    with pytest.raises(ValueError):
+        hc.range(5, 4)
+    with pytest.raises(TypeError):
+        hc.record_many(array("d", [1.0]))
+    assert hc.total == 0
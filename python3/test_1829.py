@@ -1,8 +1,23 @@
-from solution_1829 import optimal_start_letters
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from hypothesis import given
+from hypothesis.strategies import booleans, integers, lists, text, tuples
+
+from solution_1829 import (
+    CompactTrie,
+    GhostDictionary,
+    GhostSolver,
+    Node,
+    Trie,
+    optimal_start_letters,
+    parallel_winning_prefixes,
+)
 
 import pytest
 
 
+@pytest.mark.parametrize("compact", [False, True])
 @pytest.mark.parametrize(
     ("dictionary", "expected"),
     [
@@ -14,8 +29,192 @@ import pytest
             ["bear", "moir", "moire", "muse", "must", "more"],
             {"b", "mu", "mor"},
         ),
+        (
+            # Playing "abc" spells out a word, so it can't be a winning prefix in either order
+            ["abcd", "abc"],
+            set(),
+        ),
+        (
+            ["abc", "abcd"],
+            set(),
+        ),
     ],
 )
-def test_optimal_start_letters(dictionary: list[str], expected: set[str]) -> None:
-    actual = optimal_start_letters(dictionary)
+def test_optimal_start_letters(
+    dictionary: list[str], expected: set[str], compact: bool
+) -> None:
+    actual = optimal_start_letters(dictionary, compact=compact)
     assert actual == expected
+
+
+@given(lists(text("abc", min_size=1, max_size=6), min_size=1))
+def test_compact_trie(dictionary: list[str]) -> None:
+    assert optimal_start_letters(dictionary, compact=True) == optimal_start_letters(
+        dictionary
+    )
+    trie = CompactTrie.from_words(dictionary)
+    assert len(trie) == 1 + len(
+        {w[:i] for w in dictionary for i in range(1, len(w) + 1)}
+    )
+    for word in dictionary:
+        node = trie.find(word)
+        assert node is not None
+        assert trie.is_word(node)
+        assert trie.is_poisoned(node) == any(
+            w.startswith(word) and len(w) % 2 == 1 for w in dictionary
+        )
+    assert trie.find("d") is None
+
+
+def test_compact_trie_save_load(tmp_path: Path) -> None:
+    dictionary = ["bear", "moir", "moire", "muse", "must", "more", "ghost", "gh"]
+    trie = CompactTrie.from_words(dictionary)
+    path = tmp_path / "ghost.trie"
+    trie.save(path)
+    with CompactTrie.load(path) as loaded:
+        assert isinstance(loaded.labels, memoryview)
+        assert len(loaded) == len(trie)
+        assert loaded.winning_prefixes() == trie.winning_prefixes()
+        for word in dictionary:
+            node = loaded.find(word)
+            assert node == trie.find(word)
+            assert node is not None and loaded.is_word(node)
+            assert loaded.is_poisoned(node) == trie.is_poisoned(node)
+        # Saving a loaded trie writes the same file
+        loaded.save(tmp_path / "copy.trie")
+    assert (tmp_path / "copy.trie").read_bytes() == path.read_bytes()
+    assert loaded._mmap is None
+
+    (tmp_path / "bad.trie").write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        CompactTrie.load(tmp_path / "bad.trie")
+
+
+def _poisoned_flags(node: Node[str], prefix: str = "") -> dict[str, bool]:
+    flags = {prefix: node.poisoned}
+    for child in (node.children or {}).values():
+        flags.update(_poisoned_flags(child, prefix + child.value))
+    return flags
+
+
+@given(lists(tuples(booleans(), text("abc", min_size=1, max_size=5)), max_size=40))
+def test_ghost_dictionary(edits: list[tuple[bool, str]]) -> None:
+    ghost = GhostDictionary(["ab", "bca"])
+    words = {"ab", "bca"}
+    for add, word in edits:
+        if add:
+            ghost.add(word)
+            words.add(word)
+        else:
+            assert ghost.remove(word) == (word in words)
+            words.discard(word)
+        assert all(word in ghost for word in words)
+        expected = optimal_start_letters(sorted(words)) if words else set()
+        assert ghost.winning_prefixes == expected
+
+        # The trie is the same as one built from scratch
+        fresh = Trie(sentinel="")
+        for w in words:
+            fresh.insert(w)
+        assert _poisoned_flags(ghost.trie.root) == _poisoned_flags(fresh.root)
+
+
+def test_ghost_dictionary_remove() -> None:
+    ghost = GhostDictionary(["bear", "moir", "moire", "muse", "must", "more"])
+    assert ghost.winning_prefixes == {"b", "mu", "mor"}
+    assert ghost.remove("moire")
+    assert "moire" not in ghost
+    assert ghost.winning_prefixes == {"b", "m"}
+    assert not ghost.remove("moire")
+    assert not ghost.remove("mo")
+    ghost.add("moire")
+    assert ghost.winning_prefixes == {"b", "mu", "mor"}
+    with pytest.raises(ValueError):
+        ghost.add("")
+
+
+def test_optimal_start_letters_long_words() -> None:
+    # Far deeper than the recursion limit
+    dictionary = ["a" * 5001, "b" * 5000 + "c", "b" * 5000 + "de"]
+    assert optimal_start_letters(dictionary) == {"b" * 5000 + "d"}
+    assert optimal_start_letters(dictionary, compact=True) == {"b" * 5000 + "d"}
+    assert optimal_start_letters([]) == set()
+
+
+def test_parallel_winning_prefixes(tmp_path: Path) -> None:
+    dictionary = ["bear", "moir", "moire", "muse", "must", "more", "cat", "calf", "dog"]
+    expected = optimal_start_letters(dictionary)
+    assert optimal_start_letters(dictionary, workers=2) == expected
+
+    path = tmp_path / "dictionary.trie"
+    CompactTrie.from_words(dictionary).save(path)
+    assert parallel_winning_prefixes(path, workers=1) == expected
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert parallel_winning_prefixes(path, executor=executor) == expected
+
+    with pytest.raises(ValueError):
+        optimal_start_letters(dictionary, workers=0)
+    with pytest.raises(ValueError):
+        parallel_winning_prefixes(path, workers=0)
+
+
+def _brute_force_loser(prefix: str, words: set[str], players: int) -> int:
+    """Plain minimax over the word list, counting the loser from the player to move."""
+    moves = sorted(
+        {w[len(prefix)] for w in words if w.startswith(prefix) and len(w) > len(prefix)}
+    )
+    for letter in moves:
+        if prefix + letter in words:
+            continue
+        offset = (1 + _brute_force_loser(prefix + letter, words, players)) % players
+        if offset != 0:
+            return offset
+    return 0
+
+
+@given(lists(text("abc", min_size=1, max_size=5), min_size=1), integers(2, 4))
+def test_ghost_solver(dictionary: list[str], players: int) -> None:
+    solver = GhostSolver(dictionary, players)
+    words = set(dictionary)
+    prefixes = {""} | {w[:i] for w in words for i in range(1, len(w))} - words
+    for prefix in prefixes:
+        offset = _brute_force_loser(prefix, words, players)
+        assert solver.loser(prefix) == (len(prefix) + offset) % players
+        move = solver.best_move(prefix)
+        if move is not None:
+            # The move is safe, and it doesn't lose if anything doesn't
+            assert prefix + move in prefixes
+            if offset != 0:
+                assert (1 + _brute_force_loser(prefix + move, words, players)) % players
+    assert solver.winning_start_letters() == {
+        p for p in prefixes if len(p) == 1 and solver.loser(p) != 0
+    }
+
+
+def test_ghost_solver_examples() -> None:
+    # Unlike the parity heuristic, the solver sees that "c" forces "ca", and then "l" forces "calf"
+    solver = GhostSolver(["cat", "calf", "dog", "bear"])
+    assert solver.winning_start_letters() == {"b", "c"}
+    assert solver.best_move("ca") == "l"
+    assert solver.loser("ca") == 1
+    assert solver.loser("d") == 0
+    assert solver.best_move("do") is None
+
+    # With three players, whoever plays the fourth letter of "bear" loses
+    solver = GhostSolver(["bear"], players=3)
+    assert solver.loser() == 0
+    assert solver.winning_start_letters() == set()
+
+    # Solving doesn't spell out every prefix, so very long words are cheap
+    solver = GhostSolver(["a" * 20_001])
+    assert solver.loser() == 0
+    assert solver.best_move("a" * 10_000) == "a"
+
+    with pytest.raises(ValueError):
+        solver.best_move("a" * 20_001)
+    with pytest.raises(ValueError):
+        GhostSolver(["bear"]).best_move("bear")
+    with pytest.raises(ValueError):
+        solver.loser("x")
+    with pytest.raises(ValueError):
+        GhostSolver(["a"], players=1)
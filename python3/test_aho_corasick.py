@@ -0,0 +1,79 @@
+import io
+
+import pytest
+from hypothesis import given
+from hypothesis.strategies import lists, text
+
+from aho_corasick import AhoCorasick, aho_corasick_stream
+from kmp import kmp_findall
+
+
+def _expected(needles: list[str], haystack: str) -> set[tuple[str, int]]:
+    return {(n, i) for n in set(needles) for i in kmp_findall(n, haystack)}
+
+
+@pytest.mark.parametrize(
+    ("needles", "haystack", "expected"),
+    [
+        (
+            ["he", "she", "his", "hers"],
+            "ushers",
+            [("she", 1), ("he", 2), ("hers", 2)],
+        ),
+        (
+            ["a", "aa", "aaa"],
+            "aaa",
+            [("a", 0), ("aa", 0), ("a", 1), ("aaa", 0), ("aa", 1), ("a", 2)],
+        ),
+        (["abc"], "xyz", []),
+        ([], "abc", []),
+        (["abc", "abc"], "abcabc", [("abc", 0), ("abc", 3)]),
+    ],
+)
+def test_aho_corasick(
+    needles: list[str], haystack: str, expected: list[tuple[str, int]]
+) -> None:
+    automaton = AhoCorasick(needles)
+    assert automaton.findall(haystack) == expected
+    # The automaton is reusable
+    assert automaton.findall(haystack) == expected
+
+
+def test_aho_corasick_stream() -> None:
+    automaton = AhoCorasick([b"cab", b"abc", b"b"])
+    haystack = b"abcab" * 50
+    expected = automaton.findall(haystack)
+    for chunk_size in (1, 2, 3, 7, 1 << 16):
+        assert (
+            list(aho_corasick_stream(automaton, io.BytesIO(haystack), chunk_size))
+            == expected
+        )
+
+    matcher = automaton.matcher()
+    assert matcher.feed(b"ca") == []
+    assert matcher.feed(b"b") == [(b"cab", 0), (b"b", 2)]
+    assert matcher.offset == 3
+    matcher.reset()
+    assert matcher.feed(b"b") == [(b"b", 0)]
+
+
+def test_aho_corasick_bad_inputs() -> None:
+    with pytest.raises(ValueError):
+        _ = AhoCorasick(["a", ""])
+    with pytest.raises(TypeError):
+        _ = AhoCorasick(["a", b"b"])
+    with pytest.raises(TypeError):
+        _ = AhoCorasick(["a"]).findall(b"a")
+
+
+@given(
+    lists(text(alphabet="abc", min_size=1, max_size=4), max_size=8),
+    text(alphabet="abcd", max_size=40),
+)
+def test_aho_corasick_fuzzed(needles: list[str], haystack: str) -> None:
+    actual = AhoCorasick(needles).findall(haystack)
+    assert len(actual) == len(set(actual))
+    assert set(actual) == _expected(needles, haystack)
+    # Matches are ordered by where they end
+    ends = [i + len(n) for n, i in actual]
+    assert ends == sorted(ends)
@@ -1,6 +1,24 @@
+import io
+import mmap
+from array import array
+from itertools import product
+from pathlib import Path
+from typing import Any
+
 import pytest
+from hypothesis import given
+from hypothesis.strategies import text
 
-from kmp import kmp_substr, lps_table
+import kmp
+from kmp import (
+    StreamMatcher,
+    kmp_findall,
+    kmp_finditer,
+    kmp_stream,
+    kmp_substr,
+    lps_table,
+)
+from substr import BACKENDS, select_backend, substr
 
 
 @pytest.mark.parametrize(
@@ -27,6 +45,9 @@ from kmp import kmp_substr, lps_table
             [-1, 1, 0],
         ),
         ("ABCDABD", [-1, 0, 0, 0, 1, 2, 0]),
+        # The border has to be rebuilt after falling all the way back to the sentinel
+        ("abaab", [-1, 0, 1, 1, 2]),
+        ("abaabb", [-1, 0, 1, 1, 2, 0]),
     ],
 )
 def test_lps_table(needle: str, expected: list[int]) -> None:
@@ -47,6 +68,7 @@ def test_lps_table(needle: str, expected: list[int]) -> None:
         ("a", "b", -1),
         ("abc", "abdabdacf", -1),
         ("bba", "aaaaa", -1),
+        ("abab", "abaabab", 3),
     ],
 )
 def test_kmp_substr(needle: str, haystack: str, expected: int) -> None:
@@ -58,3 +80,266 @@ def test_kmp_substr(needle: str, haystack: str, expected: int) -> None:
 def test_kmp_substr_bad_inputs(needle: str, haystack: str) -> None:
     with pytest.raises(ValueError):
         _ = kmp_substr(needle, haystack)
+
+
+@pytest.mark.parametrize(
+    ("needle", "chunks", "expected"),
+    [
+        ("abc", ["ababdabc"], [5]),
+        ("abc", ["ab", "ab", "dab", "c"], [5]),
+        ("aa", ["a", "a", "a", "a"], [0, 1, 2]),
+        ("abab", ["aba", "abab"], [3]),
+        ("abaab", ["abaa", "baab"], [0, 3]),
+        ("xyz", ["", "xy", "", "z", "xyz"], [0, 3]),
+        ("abc", [], []),
+        (b"abc", [b"xxab", bytearray(b"cab"), memoryview(b"c")], [2, 5]),
+    ],
+)
+def test_stream_matcher(
+    needle: str | bytes, chunks: list[Any], expected: list[int]
+) -> None:
+    assert list(kmp_stream(needle, chunks)) == expected
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1 << 16])
+def test_kmp_stream_file(chunk_size: int) -> None:
+    haystack = "abcab" * 100
+    expected = [i for i in range(len(haystack)) if haystack.startswith("cab", i)]
+    assert list(kmp_stream("cab", io.StringIO(haystack), chunk_size)) == expected
+    assert (
+        list(kmp_stream(b"cab", io.BytesIO(haystack.encode()), chunk_size)) == expected
+    )
+
+
+def test_stream_matcher_state() -> None:
+    matcher = StreamMatcher("aba")
+    assert matcher.feed("ab") == []
+    assert matcher.feed("a") == [0]
+    assert matcher.feed("ba") == [2]
+    assert matcher.offset == 5
+    matcher.reset()
+    assert matcher.offset == 0
+    assert matcher.feed("ba") == []
+
+
+def test_stream_matcher_bad_inputs() -> None:
+    with pytest.raises(ValueError):
+        _ = StreamMatcher("")
+    with pytest.raises(TypeError):
+        _ = StreamMatcher("abc").feed(b"abc")
+    with pytest.raises(TypeError):
+        _ = StreamMatcher(b"abc").feed("abc")
+
+
+def _naive_findall(needle: str, haystack: str, overlapping: bool = True) -> list[int]:
+    """The obvious quadratic implementation to check against."""
+    res: list[int] = []
+    i = haystack.find(needle)
+    while i >= 0:
+        res.append(i)
+        i = haystack.find(needle, i + (1 if overlapping else len(needle)))
+    return res
+
+
+@pytest.mark.parametrize(
+    ("needle", "haystack", "overlapping", "max_count", "expected"),
+    [
+        ("abr", "abracadabra", True, None, [0, 7]),
+        ("aa", "aaaaa", True, None, [0, 1, 2, 3]),
+        ("aa", "aaaaa", False, None, [0, 2]),
+        ("aa", "aaaaa", True, 2, [0, 1]),
+        ("aa", "aaaaa", True, 0, []),
+        ("abab", "abaabab", True, None, [3]),
+        ("aba", "ababa", False, None, [0]),
+        ("abaab", "abaabaab", True, None, [0, 3]),
+        ("abaab", "abaabaab", False, None, [0]),
+        ("abaabb", "aaaaaabbbbabbbaabaabaabbbbbbaba", True, None, [18]),
+        ("abc", "", True, None, []),
+    ],
+)
+def test_kmp_findall(
+    needle: str,
+    haystack: str,
+    overlapping: bool,
+    max_count: int | None,
+    expected: list[int],
+) -> None:
+    assert kmp_findall(needle, haystack, overlapping, max_count) == expected
+    assert list(kmp_finditer(needle, haystack, overlapping, max_count)) == expected
+
+
+@pytest.mark.parametrize(
+    "haystack", ["abaabaabaab", "aabaabaaabaaab", "abababbababaab"]
+)
+def test_kmp_findall_every_short_needle(haystack: str) -> None:
+    # Small alphabets are where the fallback chains get long, so check every needle exhaustively.
+    for size in range(1, 8):
+        for letters in product("ab", repeat=size):
+            needle = "".join(letters)
+            for overlapping in (True, False):
+                expected = _naive_findall(needle, haystack, overlapping)
+                assert kmp_findall(needle, haystack, overlapping) == expected
+                assert (
+                    kmp_findall(needle.encode(), haystack.encode(), overlapping)
+                    == expected
+                )
+
+
+@given(text(alphabet="ab", min_size=1, max_size=8), text(alphabet="abc", max_size=40))
+def test_kmp_findall_fuzzed(needle: str, haystack: str) -> None:
+    for overlapping in (True, False):
+        expected = _naive_findall(needle, haystack, overlapping)
+        assert kmp_findall(needle, haystack, overlapping) == expected
+    if haystack:
+        assert kmp_substr(needle, haystack) == haystack.find(needle)
+
+
+def test_compile() -> None:
+    pattern = kmp.compile("abr")
+    assert pattern.search("abracadabra") == 0
+    assert pattern.search("cadabra") == 3
+    assert pattern.search("") == -1
+    assert pattern.findall("abracadabra") == [0, 7]
+    assert list(pattern.finditer("abracadabra", max_count=1)) == [0]
+    assert pattern.matcher().feed("xxab") == []
+    assert kmp.compile(b"abr").findall(b"abracadabra") == [0, 7]
+    with pytest.raises(ValueError):
+        _ = kmp.compile("")
+
+
+def test_lps_cache() -> None:
+    kmp.purge()
+    assert kmp.cache_info().currsize == 0
+    kmp.compile("needle")
+    assert kmp.cache_info().misses == 1
+    assert kmp.cache_info().hits == 0
+
+    # Every entry point shares the cache
+    kmp.compile("needle")
+    kmp_findall("needle", "haystack with a needle")
+    kmp_substr("needle", "haystack")
+    StreamMatcher("needle")
+    info = kmp.cache_info()
+    assert info.misses == 1
+    assert info.hits == 4
+    assert info.currsize == 1
+
+    kmp.purge()
+    assert kmp.cache_info().currsize == 0
+
+
+def test_dfa_cache() -> None:
+    kmp.purge()
+    # Overlapping and non-overlapping searches share one automaton per needle
+    kmp_findall(b"aa", b"aaaa")
+    kmp_findall(b"aa", b"aaaa", overlapping=False)
+    info = kmp.dfa_cache_info()
+    assert (info.misses, info.hits, info.currsize) == (1, 1, 1)
+
+    # The automata are big, so they get a much smaller bound than the LPS tables
+    for i in range(kmp.MAX_DFA_CACHE_SIZE + 10):
+        kmp_findall(f"needle{i}".encode(), b"haystack")
+    assert kmp.dfa_cache_info().currsize == kmp.MAX_DFA_CACHE_SIZE
+    assert kmp.cache_info().currsize == kmp.MAX_DFA_CACHE_SIZE + 11
+
+    kmp.purge()
+    assert kmp.dfa_cache_info().currsize == 0
+
+
+@given(text(alphabet="ab", min_size=1, max_size=5), text(alphabet="abc", max_size=40))
+def test_bytes_path_matches_str_path(needle: str, haystack: str) -> None:
+    raw = haystack.encode()
+    for overlapping in (True, False):
+        expected = kmp_findall(needle, haystack, overlapping)
+        for buffer in (raw, bytearray(raw), memoryview(raw)):
+            assert kmp_findall(needle.encode(), buffer, overlapping) == expected
+
+
+def test_bytes_path_mmap(tmp_path: Path) -> None:
+    path = tmp_path / "haystack.bin"
+    path.write_bytes(b"\x00\xffneedle\x00" * 1000)
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        actual = kmp_findall(b"needle", mm)
+        # The search must not hold on to a view of the map after it's done
+    assert actual == [2 + 9 * i for i in range(1000)]
+
+
+def test_bytes_path_long_needle() -> None:
+    # Longer than the DFA cutoff, so this uses the LPS-based engine over the buffer.
+    needle = b"ab" * kmp.MAX_DFA_NEEDLE_SIZE
+    assert kmp_findall(needle, memoryview(b"x" + needle + b"ab")) == [1, 3]
+
+
+def test_bytes_path_long_needle_mmap(tmp_path: Path) -> None:
+    path = tmp_path / "haystack.bin"
+    needle = b"x" * 1500 + b"y"
+    path.write_bytes(b"x" * 1600 + b"y")
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        actual = kmp_findall(needle, mm)
+    assert actual == [100]
+
+
+def test_bytes_path_long_needle_wide_items() -> None:
+    # The positions are in bytes, not in 16-bit items.
+    assert len(kmp_findall(b"a" * 1100, array("H", [0x6161] * 1100))) == 1101
+
+
+def test_bytes_path_bad_inputs() -> None:
+    with pytest.raises(TypeError):
+        _ = kmp_findall(b"abc", "abc")
+    with pytest.raises(TypeError):
+        _ = kmp_findall("abc", b"abc")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize(
+    ("needle", "haystack", "expected"),
+    [
+        ("a", "a", 0),
+        ("abc", "ababdabc", 5),
+        ("a", "b", -1),
+        ("abc", "abdabdacf", -1),
+        ("bba", "aaaaa", -1),
+        ("abab", "abaabab", 3),
+        ("aab", "aaaaaaab", 5),
+        ("baaa", "aaaaaaaa", -1),
+        ("needle", "haystack with a needle in it", 16),
+        (b"GATTACA", b"ACGTGATTGATTACAGATTACA", 8),
+    ],
+)
+def test_substr_backends(
+    backend: str, needle: str | bytes, haystack: str | bytes, expected: int
+) -> None:
+    assert substr(needle, haystack, backend=backend) == expected
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize(("needle", "haystack"), [("", ""), ("", "hi"), ("hi", "")])
+def test_substr_backends_bad_inputs(backend: str, needle: str, haystack: str) -> None:
+    with pytest.raises(ValueError):
+        _ = substr(needle, haystack, backend=backend)
+
+
+def test_substr_unknown_backend() -> None:
+    with pytest.raises(ValueError):
+        _ = substr("a", "a", backend="grep")
+
+
+@given(text(alphabet="abc", min_size=1, max_size=8), text(alphabet="abcd", min_size=1))
+def test_substr_backends_agree(needle: str, haystack: str) -> None:
+    results = {name: backend(needle, haystack) for name, backend in BACKENDS.items()}
+    assert len(set(results.values())) == 1, results
+    assert results["kmp"] == haystack.find(needle)
+
+
+@pytest.mark.parametrize(
+    ("needle", "alphabet_size", "expected"),
+    [
+        ("ab", None, "kmp"),
+        ("GATTACAGATTACA", None, "two_way"),
+        ("needle in a haystack", None, "horspool"),
+        ("abcdefgh", 2, "two_way"),
+    ],
+)
+def test_select_backend(needle: str, alphabet_size: int | None, expected: str) -> None:
+    assert select_backend(needle, alphabet_size) == expected
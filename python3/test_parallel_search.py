@@ -0,0 +1,69 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from kmp import kmp_findall
+from parallel_search import chunk_bounds, parallel_findall, parallel_findall_file
+
+
+def test_chunk_bounds() -> None:
+    assert chunk_bounds(10, 3, 4) == [(0, 6), (4, 10), (8, 10)]
+    assert chunk_bounds(10, 1, 5) == [(0, 5), (5, 10)]
+    assert chunk_bounds(0, 3, 4) == []
+    with pytest.raises(ValueError):
+        _ = chunk_bounds(10, 0, 4)
+    with pytest.raises(ValueError):
+        _ = chunk_bounds(10, 3, 0)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 64, 1 << 20])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parallel_findall(chunk_size: int, workers: int) -> None:
+    haystack = "abaababaab" * 20
+    for needle in ("a", "aba", "abaab", "baababaabab"):
+        expected = kmp_findall(needle, haystack)
+        assert (
+            parallel_findall(needle, haystack, workers=workers, chunk_size=chunk_size)
+            == expected
+        )
+        assert (
+            parallel_findall(
+                needle.encode(),
+                memoryview(haystack.encode()),
+                workers=workers,
+                chunk_size=chunk_size,
+            )
+            == expected
+        )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_parallel_findall_file(tmp_path: Path, chunk_size: int) -> None:
+    haystack = b"\x00needle\xffneedleneedle" * 50
+    path = tmp_path / "haystack.bin"
+    path.write_bytes(haystack)
+    expected = kmp_findall(b"needle", haystack)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        assert (
+            parallel_findall_file(b"needle", path, chunk_size=chunk_size, executor=pool)
+            == expected
+        )
+        assert parallel_findall_file(
+            b"leneed", path, chunk_size=chunk_size, executor=pool
+        ) == kmp_findall(b"leneed", haystack)
+
+
+def test_parallel_findall_file_empty(tmp_path: Path) -> None:
+    path = tmp_path / "empty.bin"
+    path.write_bytes(b"")
+    assert parallel_findall_file(b"needle", path, workers=2) == []
+
+
+def test_parallel_bad_inputs(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        _ = parallel_findall("", "abc")
+    with pytest.raises(ValueError):
+        _ = parallel_findall("a", "abc", workers=0)
+    with pytest.raises(TypeError):
+        _ = parallel_findall_file("a", tmp_path / "missing.bin")
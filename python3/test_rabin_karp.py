@@ -0,0 +1,58 @@
+import pytest
+from hypothesis import given
+from hypothesis.strategies import integers, lists, text
+
+from aho_corasick import AhoCorasick
+from rabin_karp import MODULUS, RabinKarp, polynomial_hash
+
+
+@pytest.mark.parametrize(
+    ("needles", "haystack", "expected"),
+    [
+        (["abr", "cad"], "abracadabra", [("abr", 0), ("cad", 4), ("abr", 7)]),
+        (["aa"], "aaaa", [("aa", 0), ("aa", 1), ("aa", 2)]),
+        (["abc"], "ab", []),
+        ([], "abc", []),
+        ([b"ID-1", b"ID-2"], b"xxID-2ID-1", [(b"ID-2", 2), (b"ID-1", 6)]),
+    ],
+)
+def test_rabin_karp(
+    needles: list[str | bytes],
+    haystack: str | bytes,
+    expected: list[tuple[str | bytes, int]],
+) -> None:
+    assert RabinKarp(needles).findall(haystack) == expected
+
+
+def test_rabin_karp_hash_collisions(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Force every window to collide with every needle, so only verification keeps this exact.
+    monkeypatch.setattr("rabin_karp.MODULUS", 1)
+    assert RabinKarp(["ab", "ba"]).findall("aabba") == [("ab", 1), ("ba", 3)]
+
+
+def test_rabin_karp_bad_inputs() -> None:
+    with pytest.raises(ValueError):
+        _ = RabinKarp(["a", "ab"])
+    with pytest.raises(ValueError):
+        _ = RabinKarp([""])
+    with pytest.raises(TypeError):
+        _ = RabinKarp(["a", b"b"])
+    with pytest.raises(TypeError):
+        _ = RabinKarp(["a"]).findall(b"a")
+
+
+@given(
+    integers(min_value=1, max_value=4).flatmap(
+        lambda m: lists(text(alphabet="abc", min_size=m, max_size=m), max_size=20)
+    ),
+    text(alphabet="abcd", max_size=60),
+)
+def test_rabin_karp_matches_aho_corasick(needles: list[str], haystack: str) -> None:
+    expected = sorted(AhoCorasick(needles).findall(haystack), key=lambda x: x[1])
+    assert RabinKarp(needles).findall(haystack) == expected
+
+
+def test_polynomial_hash() -> None:
+    assert polynomial_hash("") == 0
+    assert polynomial_hash("abc") == polynomial_hash(b"abc")
+    assert 0 <= polynomial_hash("\U0010ffff" * 10) < MODULUS
@@ -0,0 +1,88 @@
+import importlib
+from pathlib import Path
+
+import pytest
+from hypothesis import given
+from hypothesis.strategies import text
+
+from suffix_array import SuffixArrayIndex, build_lcp_array, build_suffix_array
+
+problem_522 = importlib.import_module("522")
+
+
+@pytest.mark.parametrize(
+    ("haystack", "expected_sa", "expected_lcp"),
+    [
+        ("banana", [5, 3, 1, 0, 4, 2], [0, 1, 3, 0, 0, 2]),
+        ("aaaa", [3, 2, 1, 0], [0, 1, 2, 3]),
+        (b"abab", [2, 0, 3, 1], [0, 2, 0, 1]),
+        ("", [], []),
+    ],
+)
+def test_build_arrays(
+    haystack: str | bytes, expected_sa: list[int], expected_lcp: list[int]
+) -> None:
+    sa = build_suffix_array(haystack)
+    assert list(sa) == expected_sa
+    assert list(build_lcp_array(haystack, sa)) == expected_lcp
+
+
+@pytest.mark.parametrize(
+    ("haystack", "needle", "expected"),
+    [
+        ("abracadabra", "abr", [0, 7]),
+        ("abracadabra", "a", [0, 3, 5, 7, 10]),
+        ("aaaaa", "aa", [0, 1, 2, 3]),
+        ("abracadabra", "abracadabrab", []),
+        ("abracadabra", "z", []),
+        ("", "a", []),
+    ],
+)
+def test_find_all(haystack: str, needle: str, expected: list[int]) -> None:
+    index = SuffixArrayIndex(haystack)
+    assert index.find_all(needle) == expected
+    assert SuffixArrayIndex(haystack.encode()).find_all(needle.encode()) == expected
+
+
+@given(text(alphabet="abc", max_size=60), text(alphabet="abc", min_size=1, max_size=4))
+def test_find_all_matches_522(haystack: str, needle: str) -> None:
+    assert SuffixArrayIndex(haystack).find_all(needle) == problem_522.indices(
+        haystack, needle
+    )
+
+
+@pytest.mark.parametrize(
+    "haystack", ["mississippi", "naïve café ☕ naïve", b"\x00\xff\x00\xff"]
+)
+def test_save_load(tmp_path: Path, haystack: str | bytes) -> None:
+    index = SuffixArrayIndex(haystack)
+    path = tmp_path / "index.bin"
+    index.save(path)
+    with SuffixArrayIndex.load(path) as loaded:
+        assert len(loaded) == len(haystack)
+        assert list(loaded.suffix_array) == list(index.suffix_array)
+        assert list(loaded.lcp) == list(index.lcp)
+        for start in range(len(haystack)):
+            for stop in range(start + 1, min(start + 4, len(haystack)) + 1):
+                needle = haystack[start:stop]
+                assert loaded.find_all(needle) == index.find_all(needle)
+
+        # Saving a loaded index writes the same file
+        copy = tmp_path / "copy.bin"
+        loaded.save(copy)
+        assert copy.read_bytes() == path.read_bytes()
+
+
+def test_load_bad_file(tmp_path: Path) -> None:
+    path = tmp_path / "index.bin"
+    path.write_bytes(b"\x00" * 64)
+    with pytest.raises(ValueError):
+        _ = SuffixArrayIndex.load(path)
+
+
+def test_find_all_bad_inputs() -> None:
+    index = SuffixArrayIndex("abc")
+    with pytest.raises(ValueError):
+        _ = index.find_all("")
+    with pytest.raises(TypeError):
+        _ = index.find_all(b"a")
@@ -0,0 +1,123 @@
+"""
+The Crochemore-Perrin two-way substring matching algorithm.
+
+The needle is split at a "critical factorization" `needle = u + v`, computed from its maximal
+suffixes. We match `v` left to right and, only once it matches, `u` right to left. The factorization
+guarantees that a mismatch in either half lets us shift safely by an amount derived from the
+needle's period. That gives a worst case of $O(n + m)$ like KMP with only $O(1)$ extra space, and
+the shifts are often long in practice.
+"""
+
+from kmp import Text
+
+
+def maximal_suffix(needle: Text, reverse: bool = False) -> tuple[int, int]:
+    """
+    Find the lexicographically maximal suffix of `needle`.
+
+    Args:
+        needle: The string that you want to search for matches within a larger string.
+        reverse: Whether to use the reversed alphabet ordering, which gives the minimal suffix.
+
+    Returns:
+        A tuple of `(i, p)` where the maximal suffix is `needle[i + 1:]` (so `i` can be `-1`), and
+        `p` is the period of that suffix.
+    """
+    m = len(needle)
+    ms = -1  # The index right before the best suffix so far
+    j = 0  # The start of the candidate suffix, minus one
+    k = 1  # The offset we're comparing within the candidate
+    p = 1  # The period of the best suffix
+
+    while j + k < m:
+        a = needle[j + k]
+        b = needle[ms + k]
+        if (a > b) if reverse else (a < b):
+            # The candidate is smaller, so it can't be the maximal suffix. Skip past it, and the
+            # period of the best suffix grows to cover everything we skipped.
+            j += k
+            k = 1
+            p = j - ms
+        elif a == b:
+            # Still consistent with the current period
+            if k != p:
+                k += 1
+            else:
+                j += p
+                k = 1
+        else:
+            # The candidate is bigger, so it becomes the new best suffix.
+            ms = j
+            j = ms + 1
+            k = p = 1
+    return ms, p
+
+
+def two_way_substr(needle: Text, haystack: Text) -> int:
+    """
+    Uses the two-way string matching algorithm to find the starting index where `needle` is in
+    `haystack` (if `haystack` contains `needle`).
+
+    Args:
+        needle: The substring to search for within `haystack`. This must not be an empty string.
+        haystack: The string to search. This must not be an empty string.
+
+    Returns:
+        The start index of where `needle` is in `haystack`. If the substring is not found,
+        this will return `-1`.
+    """
+    if len(haystack) == 0:
+        raise ValueError("The haystack must not be an empty string")
+    if len(needle) == 0:
+        raise ValueError("The needle must not be an empty string")
+    if isinstance(needle, str) != isinstance(haystack, str):
+        raise TypeError(
+            "The needle and haystack must both be str or both be bytes-like"
+        )
+
+    m = len(needle)
+    n = len(haystack)
+
+    # The critical factorization is at whichever of the two maximal suffixes is shorter.
+    i, p = maximal_suffix(needle)
+    j, q = maximal_suffix(needle, reverse=True)
+    ell, period = (i, p) if i > j else (j, q)
+
+    if needle[: ell + 1] == needle[period : period + ell + 1]:
+        # The needle is periodic. After a full match of the right half, we can shift by the period
+        # and remember how much of the left half is already known to match (`memory`).
+        pos = 0
+        memory = -1
+        while pos <= n - m:
+            k = max(ell, memory) + 1
+            while k < m and needle[k] == haystack[pos + k]:
+                k += 1
+            if k >= m:
+                k = ell
+                while k > memory and needle[k] == haystack[pos + k]:
+                    k -= 1
+                if k <= memory:
+                    return pos
+                pos += period
+                memory = m - period - 1
+            else:
+                pos += k - ell
+                memory = -1
+    else:
+        # Not periodic, so any mismatch in the left half lets us shift past most of the needle.
+        period = max(ell + 1, m - ell - 1) + 1
+        pos = 0
+        while pos <= n - m:
+            k = ell + 1
+            while k < m and needle[k] == haystack[pos + k]:
+                k += 1
+            if k >= m:
+                k = ell
+                while k >= 0 and needle[k] == haystack[pos + k]:
+                    k -= 1
+                if k < 0:
+                    return pos
+                pos += period
+            else:
+                pos += k - ell
+    return -1